@@ -0,0 +1,11 @@
+# Chargé automatiquement par gunicorn depuis le répertoire de travail (/app).
+
+
+def post_worker_init(worker):
+    # connexion DB ouverte dans chaque worker (jamais dans le master, cf. helpdesk/warmup.py),
+    # gardée pour la première requête
+    from django.conf import settings
+
+    if settings.WARMUP_ON_BOOT:
+        from helpdesk.warmup import warm_up
+        warm_up(("database",))
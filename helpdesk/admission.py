@@ -0,0 +1,213 @@
+"""
+Contrôle d'admission : limite de débit par utilisateur et par type
+d'endpoint (token buckets), plus une limite globale de requêtes simultanées.
+
+Plutôt que de laisser les requêtes s'empiler jusqu'au timeout (et saturer
+Postgres), on répond tout de suite 429 (débit dépassé) ou 503 (serveur
+plein) avec un en-tête Retry-After.
+
+Les anonymes sont comptés par adresse IP du client : derrière un reverse
+proxy, l'adresse est prise dans X-Forwarded-For, en ne faisant confiance
+qu'aux proxies listés dans TRUSTED_PROXIES (sinon tous les anonymes, et
+toutes les tentatives de connexion, partageraient le bucket du proxy).
+
+MAX_CONCURRENT est une limite par process, entre threads : elle n'a d'effet
+qu'avec des workers multi-threads (gunicorn gthread, ASGI). Un worker sync
+mono-thread ne traite de toute façon qu'une requête à la fois.
+
+Les buckets vivent dans le process ; avec "SHARED": True le décompte passe
+par le cache Django (fenêtre fixe) et devient commun à tous les workers
+(approximatif si le backend n'a pas d'incr() atomique, cf. CacheLimiter).
+"""
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SHARED": False,
+    "MAX_CONCURRENT": 32,        # requêtes simultanées par process (workers multi-threads seulement)
+    "TRUSTED_PROXIES": (),       # IP/réseaux des reverse proxies (X-Forwarded-For)
+    "MAX_TRACKED": 10000,        # buckets gardés en mémoire (LRU)
+    # budget: (jetons par minute, rafale max)
+    "BUDGETS": {
+        "read": (300, 60),
+        "write": (60, 20),
+        "search": (60, 15),
+        "export": (6, 2),
+        "bulk": (6, 2),
+    },
+    # url_name -> budget pour les endpoints coûteux
+    "ENDPOINTS": {
+        "tickets:ticket_list": "search",
+        "tickets:ticket_similar": "search",
+        "tickets:client_list": "search",
+        "tickets:client_lookup": "search",
+        "tickets:activity_feed": "read",
+        "tickets:ticket_auto_assign": "bulk",
+    },
+    "EXEMPT_PREFIXES": ("/static/",),
+}
+
+
+def get_config():
+    conf = {**DEFAULTS, **getattr(settings, "ADMISSION_CONTROL", {})}
+    conf["BUDGETS"] = {**DEFAULTS["BUDGETS"], **conf["BUDGETS"]}
+    conf["ENDPOINTS"] = {**DEFAULTS["ENDPOINTS"], **conf["ENDPOINTS"]}
+    return conf
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Renvoie 0 si un jeton a été pris, sinon le délai (s) avant le prochain."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class LocalLimiter:
+    def __init__(self, budgets, max_tracked):
+        self.budgets = budgets
+        self.max_tracked = max_tracked
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, who, budget):
+        key = (who, budget)
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(*self.budgets[budget])
+                if len(self.buckets) > self.max_tracked:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            return bucket.take()
+
+
+class CacheLimiter:
+    """
+    Variante partagée entre workers : compteur par fenêtre d'une minute dans le cache.
+
+    add() + incr() sont atomiques sur memcached/redis ; avec les caches fichier
+    et base de données, incr() est un get puis un set : des requêtes
+    simultanées peuvent lire la même valeur, la limite est alors approximative
+    (quelques requêtes de plus par fenêtre).
+    """
+
+    def __init__(self, budgets):
+        self.budgets = budgets
+
+    def take(self, who, budget):
+        per_minute, burst = self.budgets[budget]
+        now = time.time()
+        window = int(now // 60)
+        key = f"admission:{budget}:{who}:{window}"
+        cache.add(key, 0, 90)
+        try:
+            count = cache.incr(key)
+        except ValueError:  # clé expirée entre add et incr
+            cache.set(key, 1, 90)
+            count = 1
+        if count <= per_minute + burst:
+            return 0
+        return (window + 1) * 60 - now
+
+
+def classify(request, endpoints):
+    """Budget applicable à la requête (None = pas de limite de débit)."""
+    try:
+        match = resolve(request.path_info)
+        name = f"{match.namespace}:{match.url_name}" if match.namespace else match.url_name
+    except Resolver404:
+        name = None
+
+    budget = endpoints.get(name)
+    if budget == "search" and request.method == "GET" and not (request.GET.get("q") or request.GET.get("title")):
+        budget = None  # listing simple : budget de lecture normal
+    if budget == "bulk" and request.method != "POST":
+        budget = None  # l'aperçu (dry-run) est une lecture
+    if budget is None:
+        budget = "read" if request.method in ("GET", "HEAD", "OPTIONS") else "write"
+    return budget
+
+
+def _networks(values):
+    return tuple(ipaddress.ip_network(v, strict=False) for v in values)
+
+
+def _trusted(addr, proxies):
+    try:
+        ip = ipaddress.ip_address(addr)
+    except ValueError:
+        return False
+    return any(ip in net for net in proxies)
+
+
+def client_ip(request, proxies):
+    """IP du client : X-Forwarded-For lu de droite à gauche tant que l'émetteur est un proxy de confiance."""
+    addr = request.META.get("REMOTE_ADDR", "")
+    if not proxies or not _trusted(addr, proxies):
+        return addr
+    forwarded = [a.strip() for a in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if a.strip()]
+    for hop in reversed(forwarded):
+        if not _trusted(hop, proxies):
+            return hop
+        addr = hop
+    return addr
+
+
+def _reject(status, retry_after, message):
+    response = HttpResponse(message, status=status, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        conf = self.conf = get_config()
+        if conf["SHARED"]:
+            self.limiter = CacheLimiter(conf["BUDGETS"])
+        else:
+            self.limiter = LocalLimiter(conf["BUDGETS"], conf["MAX_TRACKED"])
+        self.slots = threading.BoundedSemaphore(conf["MAX_CONCURRENT"])
+        self.proxies = _networks(conf["TRUSTED_PROXIES"])
+
+    def __call__(self, request):
+        if not self.conf["ENABLED"] or request.path_info.startswith(tuple(self.conf["EXEMPT_PREFIXES"])):
+            return self.get_response(request)
+
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            who = f"u{user.pk}"
+        else:
+            who = f"ip{client_ip(request, self.proxies)}"
+
+        # place d'abord : une requête refusée en 503 ne consomme pas de jeton
+        if not self.slots.acquire(blocking=False):
+            return _reject(503, 1, "Serveur momentanément saturé : merci de réessayer dans un instant.")
+        try:
+            wait = self.limiter.take(who, classify(request, self.conf["ENDPOINTS"]))
+            if wait:
+                return _reject(429, wait, "Trop de requêtes : merci de patienter avant de réessayer.")
+            return self.get_response(request)
+        finally:
+            self.slots.release()
@@ -0,0 +1,208 @@
+"""
+Cache à deux niveaux.
+
+- L1 : LRU en mémoire du process (aucun aller-retour réseau/disque) ;
+- L2 : cache Django partagé (`CACHES["default"]` : fichiers ou base, sans Redis).
+
+Les clés sont rangées par espace de noms (ex. "tickets") avec un
+jeton de génération stocké en L2. `invalidate(ns)` remplace ce jeton par un
+nouveau, unique, après le commit : toutes les anciennes clés deviennent
+inaccessibles d'un coup. Un jeton neuf plutôt qu'un incr() : sur les caches
+fichier/base incr() n'est pas atomique et deux invalidations simultanées
+pourraient n'en faire qu'une.
+
+Une valeur calculée est rangée sous la génération lue *avant* le calcul
+(`get_or_set`, paramètre `gen`) : si une invalidation survient pendant le
+calcul, le résultat, peut-être périmé, n'est jamais relu.
+Les autres workers sont prévenus par Postgres LISTEN/NOTIFY et oublient leur
+génération locale ; sans NOTIFY, elle expire au bout de GENERATION_TTL secondes.
+"""
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BACKEND": "default",
+    "L1_SIZE": 2048,
+    "GENERATION_TTL": 5,      # secondes, filet de sécurité si LISTEN/NOTIFY est indisponible
+    "TIMEOUT": 300,
+    "LISTEN": True,
+    "CHANNEL": "cache_invalidate",
+}
+
+_MISSING = object()
+
+
+class LRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key, _MISSING)
+            if value is not _MISSING:
+                self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def purge(self, namespace):
+        with self.lock:
+            for key in [k for k in self.data if k[0] == namespace]:
+                del self.data[key]
+
+    def __len__(self):
+        return len(self.data)
+
+
+class TwoTierCache:
+    def __init__(self, conf=None):
+        self.conf = {**DEFAULTS, **(conf or getattr(settings, "TWO_TIER_CACHE", {}))}
+        self.l1 = LRU(self.conf["L1_SIZE"])
+        self.generations = {}  # ns -> (génération, lue à)
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "notifications": 0}
+        self._listener_pid = None
+
+    @property
+    def l2(self):
+        return caches[self.conf["BACKEND"]]
+
+    # --- générations ---
+    def generation(self, ns):
+        self._ensure_listener()
+        cached = self.generations.get(ns)
+        if cached and time.monotonic() - cached[1] < self.conf["GENERATION_TTL"]:
+            return cached[0]
+        gen = self.l2.get(f"tt:gen:{ns}")
+        if gen is None:
+            self.l2.add(f"tt:gen:{ns}", uuid.uuid4().hex, None)
+            gen = self.l2.get(f"tt:gen:{ns}")
+        self.generations[ns] = (gen, time.monotonic())
+        return gen
+
+    def _forget(self, ns):
+        self.generations.pop(ns, None)
+        self.l1.purge(ns)
+
+    # --- lecture / écriture ---
+    def get(self, ns, key, default=None, gen=None):
+        gen = self.generation(ns) if gen is None else gen
+        value = self.l1.get((ns, gen, key))
+        if value is not _MISSING:
+            self.stats["l1_hits"] += 1
+            return value
+        value = self.l2.get(f"tt:{ns}:{gen}:{key}", _MISSING)
+        if value is not _MISSING:
+            self.stats["l2_hits"] += 1
+            self.l1.set((ns, gen, key), value)
+            return value
+        self.stats["misses"] += 1
+        return default
+
+    def set(self, ns, key, value, timeout=None, gen=None):
+        """`gen` : génération lue avant de calculer `value` (sinon la génération actuelle)."""
+        gen = self.generation(ns) if gen is None else gen
+        self.stats["sets"] += 1
+        self.l1.set((ns, gen, key), value)
+        self.l2.set(f"tt:{ns}:{gen}:{key}", value, self.conf["TIMEOUT"] if timeout is None else timeout)
+
+    def get_or_set(self, ns, key, compute, timeout=None):
+        gen = self.generation(ns)
+        value = self.get(ns, key, _MISSING, gen=gen)
+        if value is _MISSING:
+            value = compute()
+            self.set(ns, key, value, timeout, gen=gen)
+        return value
+
+    # --- invalidation ---
+    def invalidate(self, *namespaces):
+        """Invalide les espaces de noms, une fois la transaction courante validée."""
+        for ns in namespaces:
+            transaction.on_commit(partial(self._invalidate_now, ns))
+
+    def _invalidate_now(self, ns):
+        # appelé après le commit : une erreur ici ne doit pas faire échouer la requête
+        self.stats["invalidations"] += 1
+        key = f"tt:gen:{ns}"
+        try:
+            self.l2.set(key, uuid.uuid4().hex, None)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", [self.conf["CHANNEL"], ns])
+        except Exception:
+            logger.exception("Invalidation du cache %r en échec (expiration sous %s s)", ns, self.conf["TIMEOUT"])
+        finally:
+            self._forget(ns)
+
+    # --- écoute des autres workers ---
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        self._listener_pid = pid  # un thread par process (y compris après fork)
+        if not self.conf["LISTEN"] or settings.DATABASES["default"]["ENGINE"] != "django.db.backends.postgresql":
+            return
+        threading.Thread(target=self._listen, name="cache-invalidation", daemon=True).start()
+
+    def _listen(self):
+        import psycopg2
+
+        db = settings.DATABASES["default"]
+        while True:
+            try:
+                conn = psycopg2.connect(
+                    dbname=db["NAME"], user=db["USER"], password=db["PASSWORD"],
+                    host=db["HOST"], port=db["PORT"], **db.get("OPTIONS", {}),
+                )
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.conf["CHANNEL"]}"')
+                # les invalidations manquées pendant la (re)connexion
+                self.generations.clear()
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        self.stats["notifications"] += 1
+                        self._forget(note.payload)
+            except Exception:
+                logger.exception("Écoute des invalidations de cache interrompue, nouvel essai dans 5 s")
+                self.generations.clear()
+                time.sleep(5)
+
+    def info(self):
+        lookups = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["misses"]
+        hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+        return {
+            **self.stats,
+            "evictions": self.l1.evictions,
+            "l1_size": len(self.l1),
+            "l1_max": self.l1.maxsize,
+            "hit_ratio": round(hits / lookups, 3) if lookups else None,
+            "pid": os.getpid(),
+        }
+
+
+two_tier = TwoTierCache()
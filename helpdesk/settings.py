@@ -64,16 +64,21 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'accounts',
     'tickets',
+    'jobs',
+    'notifications',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # sert STATIC_ROOT (versions .gz/.br comprises)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'helpdesk.admission.AdmissionControlMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,6 +96,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "tickets.context_processors.inbox_badge",
             ],
         },
     },
@@ -143,6 +149,71 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = env("STATIC_ROOT", default=str(BASE_DIR / "staticfiles"))
+# collectstatic (au build) : noms hashés + versions gzip/brotli précalculées
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# Préchauffage des workers au démarrage (URLs, templates, connexion DB)
+WARMUP_ON_BOOT = env.bool("WARMUP_ON_BOOT", default=True)
+
+# Emails (notifications regroupées)
+EMAIL_BACKEND = env("EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+EMAIL_HOST = env("EMAIL_HOST", default="localhost")
+EMAIL_PORT = env.int("EMAIL_PORT", default=25)
+EMAIL_HOST_USER = env("EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
+EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=False)
+DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="ticketarr@localhost")
+SITE_URL = env("SITE_URL", default="https://sae502.nekocorp.fr")
+NOTIFICATIONS_DIGEST_WINDOW = env.int("NOTIFICATIONS_DIGEST_WINDOW", default=300)  # secondes
+SLA_WARNING_MINUTES = env.int("SLA_WARNING_MINUTES", default=30)  # avertissement avant échéance
+
+# Pièces jointes (stockage adressé par contenu sur le volume persistant)
+ATTACHMENTS_ROOT = env("ATTACHMENTS_ROOT", default="/django_state/attachments")
+ATTACHMENTS_MAX_SIZE = env.int("ATTACHMENTS_MAX_SIZE", default=50 * 1024 * 1024)  # octets
+# ex. "X-Accel-Redirect" (nginx) ou "X-Sendfile" (apache) ; vide = Django sert le fichier
+ATTACHMENTS_SENDFILE_HEADER = env("ATTACHMENTS_SENDFILE_HEADER", default="")
+ATTACHMENTS_SENDFILE_PREFIX = env("ATTACHMENTS_SENDFILE_PREFIX", default="/protected-attachments/")
+
+# Cache partagé entre workers (L2 du cache à deux niveaux, cf. helpdesk/cache.py)
+# CACHE_BACKEND = "file" (volume /django_state), "db" (manage.py createcachetable) ou "locmem"
+CACHE_BACKEND = env("CACHE_BACKEND", default="file")
+CACHE_LOCATION = env("CACHE_LOCATION", default="/django_state/cache")
+if CACHE_BACKEND == "file" and not (
+    os.path.isdir(CACHE_LOCATION) or os.access(os.path.dirname(CACHE_LOCATION), os.W_OK)
+):
+    CACHE_BACKEND = "locmem"  # hors Docker (dev, CI) : pas de volume /django_state
+CACHES = {
+    "default": {
+        "file": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_LOCATION,
+        },
+        "db": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        },
+        "locmem": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }[CACHE_BACKEND]
+}
+TWO_TIER_CACHE = {
+    "L1_SIZE": env.int("CACHE_L1_SIZE", default=2048),
+    "LISTEN": env.bool("CACHE_LISTEN", default=True),
+}
+
+# Contrôle d'admission (limites de débit + requêtes simultanées), cf. helpdesk/admission.py
+ADMISSION_CONTROL = {
+    "ENABLED": env.bool("ADMISSION_ENABLED", default=True),
+    "SHARED": env.bool("ADMISSION_SHARED", default=False),
+    "MAX_CONCURRENT": env.int("ADMISSION_MAX_CONCURRENT", default=32),
+    # reverse proxy devant Django (ex. "172.52.0.0/24") : IP client lue dans X-Forwarded-For
+    "TRUSTED_PROXIES": env.list("ADMISSION_TRUSTED_PROXIES", default=[]),
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
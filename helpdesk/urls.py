@@ -12,6 +12,7 @@ urlpatterns = [
     path("accounts/", include("django.contrib.auth.urls")),  # login/logout/password views
     path("", RedirectView.as_view(pattern_name="tickets:ticket_list", permanent=False)),
     path("tickets/", include("tickets.urls")),
+    path("notifications/", include("notifications.urls")),
 ]
 
 
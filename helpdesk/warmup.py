@@ -0,0 +1,93 @@
+"""
+Préchauffage d'un worker après démarrage : tout ce que la première requête
+paierait sinon (résolution des URLs, compilation des templates, connexion DB).
+
+Quand WARMUP_ON_BOOT est actif :
+- wsgi.py/asgi.py préchauffent URLs et templates à l'import (partagé par
+  fork avec `gunicorn --preload`) ;
+- la connexion DB est ouverte par worker, dans le hook `post_worker_init` de
+  gunicorn.conf.py, et gardée pour la première requête. Jamais à l'import :
+  avec --preload les workers forkés hériteraient de la socket du master.
+
+Sous ASGI les vues synchrones tournent dans un thread de l'exécuteur, qui a
+ses propres connexions : pas de préchauffage DB possible depuis l'import.
+`manage.py warmup` fait tout, dans le process courant.
+"""
+import logging
+import os
+import time
+
+from django.db import connections
+from django.template import engines
+from django.template.exceptions import TemplateSyntaxError
+from django.urls import get_resolver, reverse, NoReverseMatch
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = (".html", ".txt")
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver._populate()  # noqa: SLF001 - construit les index de reverse()
+    n = 0
+    for name in list(resolver.reverse_dict):
+        if isinstance(name, str):
+            try:
+                reverse(name)
+            except NoReverseMatch:
+                pass  # URL avec paramètres : les regex sont compilées quand même
+            n += 1
+    for namespace, (_, sub) in resolver.namespace_dict.items():
+        sub._populate()  # noqa: SLF001
+        n += len([k for k in sub.reverse_dict if isinstance(k, str)])
+    return n
+
+
+def template_names(engine):
+    for directory in engine.template_dirs:
+        directory = str(directory)
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, "/")
+
+
+def warm_templates():
+    # le loader "cached" (par défaut) garde les templates compilés pour la vie du process
+    n = 0
+    for engine in engines.all():
+        for name in set(template_names(engine)):
+            try:
+                engine.get_template(name)
+                n += 1
+            except TemplateSyntaxError:
+                logger.exception("Template invalide : %s", name)
+    return n
+
+
+def warm_database():
+    n = 0
+    for conn in connections.all():
+        conn.ensure_connection()
+        n += 1
+    return n
+
+
+STEPS = {"urls": warm_urls, "templates": warm_templates, "database": warm_database}
+
+
+def warm_up(steps=tuple(STEPS)):
+    """Renvoie {étape: (nombre d'éléments, durée en ms)}."""
+    timings = {}
+    for step in steps:
+        func = STEPS[step]
+        start = time.perf_counter()
+        try:
+            count = func()
+        except Exception:  # un worker doit démarrer même si la DB n'est pas encore là
+            logger.exception("Préchauffage %s en échec", step)
+            count = 0
+        timings[step] = (count, (time.perf_counter() - start) * 1000)
+    logger.info("Préchauffage : %s", ", ".join(f"{k}={c} ({ms:.0f} ms)" for k, (c, ms) in timings.items()))
+    return timings
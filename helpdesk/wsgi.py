@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'helpdesk.settings')
 
 application = get_wsgi_application()
+
+# Préchauffe le worker avant qu'il ne reçoive sa première requête
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_BOOT:
+    from helpdesk.warmup import warm_up  # noqa: E402
+    warm_up(("urls", "templates"))  # DB : par worker, cf. gunicorn.conf.py
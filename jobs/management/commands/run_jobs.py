@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Worker de la file de tâches (SELECT ... FOR UPDATE SKIP LOCKED)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Vide la file puis s'arrête")
+        parser.add_argument("--batch", type=int, default=10, help="Tâches réservées par lot")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Attente (s) quand la file est vide")
+
+    def handle(self, *args, **opts):
+        worker = queue.worker_id()
+        self.stdout.write(f"Worker {worker} démarré.")
+        try:
+            while True:
+                close_old_connections()
+                queue.release_stale()
+                done = queue.run_pending(opts["batch"], worker)
+                if done:
+                    continue
+                if opts["once"]:
+                    break
+                time.sleep(opts["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Worker {worker} arrêté.")
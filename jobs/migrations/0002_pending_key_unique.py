@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PEND')), fields=('idempotency_key',), name='jobs_pending_key_uniq'),
+        ),
+    ]
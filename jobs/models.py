@@ -0,0 +1,44 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PEND", "En attente"
+        RUNNING = "RUN", "En cours"
+        DONE = "DONE", "Terminé"
+        FAILED = "FAIL", "Échec"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=4, choices=Status.choices, default=Status.PENDING)
+
+    # 👇 Une seule tâche *en attente* par clé (double clic, double envoi…) ;
+    # une fois exécutée, la même clé peut être remise en file
+    idempotency_key = models.CharField(max_length=200, null=True, blank=True)
+
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["idempotency_key"], condition=Q(status="PEND"),
+                                    name="jobs_pending_key_uniq"),
+        ]
+        indexes = [
+            # file d'attente : seules les tâches en attente sont indexées
+            models.Index(fields=["run_at", "id"], condition=Q(status="PEND"), name="jobs_pending_run_at_idx"),
+            models.Index(fields=["status", "locked_at"]),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.pk} {self.name} [{self.get_status_display()}]"
@@ -0,0 +1,142 @@
+"""
+File de tâches stockée dans Postgres (pas de broker).
+
+- `@task("nom")` déclare une tâche ; `enqueue("nom", ...)` l'ajoute.
+- L'insertion se fait dans la transaction de l'appelant : la tâche n'est
+  visible des workers qu'au commit, et disparaît si la transaction est annulée.
+- Les workers réservent des lots avec SELECT ... FOR UPDATE SKIP LOCKED,
+  plusieurs workers peuvent donc tourner en parallèle sans se marcher dessus.
+- En cas d'erreur la tâche est replanifiée avec un backoff exponentiel.
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+BACKOFF_BASE = getattr(settings, "JOBS_BACKOFF_BASE", 5)       # secondes
+BACKOFF_MAX = getattr(settings, "JOBS_BACKOFF_MAX", 3600)      # secondes
+LOCK_TIMEOUT = getattr(settings, "JOBS_LOCK_TIMEOUT", 600)     # secondes avant de reprendre une tâche orpheline
+
+
+def task(name, max_attempts=5):
+    def decorator(func):
+        func.job_name = name
+        func.max_attempts = max_attempts
+        REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def _job(name, payload=None, key=None, run_at=None, delay=None, max_attempts=None):
+    if name not in REGISTRY:
+        raise KeyError(f"Tâche inconnue : {name}")
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    return Job(
+        name=name,
+        payload=payload or {},
+        idempotency_key=key,
+        run_at=run_at,
+        max_attempts=max_attempts or REGISTRY[name].max_attempts,
+    )
+
+
+def enqueue(name, payload=None, *, key=None, run_at=None, delay=None, max_attempts=None):
+    """
+    Ajoute une tâche et la renvoie. Avec `key`, si une tâche en attente porte
+    déjà cette clé, rien n'est ajouté et c'est elle qui est renvoyée (une tâche
+    déjà exécutée n'empêche pas de remettre la clé en file).
+    `run_at`/`delay` permettent de la planifier plus tard.
+    """
+    job = _job(name, payload, key, run_at, delay, max_attempts)
+    if key is None:
+        job.save()
+        return job
+    # ON CONFLICT DO NOTHING : un doublon ne casse pas la transaction appelante
+    Job.objects.bulk_create([job], ignore_conflicts=True)
+    keyed = Job.objects.filter(idempotency_key=key)
+    return keyed.filter(status=Job.Status.PENDING).first() or keyed.order_by("-id").first()
+
+
+def enqueue_many(jobs):
+    """
+    Version lot : `jobs` = [{"name": ..., "payload": ..., "key": ...}, ...],
+    un seul INSERT ; les clés déjà en attente sont ignorées.
+    """
+    Job.objects.bulk_create([_job(**spec) for spec in jobs], ignore_conflicts=True)
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def release_stale():
+    """Remet en attente les tâches d'un worker mort en cours d'exécution."""
+    limit = timezone.now() - timedelta(seconds=LOCK_TIMEOUT)
+    return (Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=limit)
+            .update(status=Job.Status.PENDING, locked_at=None, locked_by=""))
+
+
+def claim(batch_size=10, worker=None):
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True)
+                    .filter(status=Job.Status.PENDING, run_at__lte=now)
+                    .order_by("run_at", "id")[:batch_size])
+        if jobs:
+            Job.objects.filter(pk__in=[j.pk for j in jobs]).update(
+                status=Job.Status.RUNNING, locked_at=now, locked_by=worker or worker_id(),
+            )
+    return jobs
+
+
+def execute(job):
+    job.attempts += 1
+    func = REGISTRY.get(job.name)
+    try:
+        if func is None:
+            raise KeyError(f"Tâche inconnue : {job.name}")
+        with transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.Status.PENDING
+            job.run_at = timezone.now() + backoff(job.attempts)
+        else:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+        logger.warning("Job %s (%s) en échec, tentative %s/%s", job.pk, job.name, job.attempts, job.max_attempts)
+    else:
+        job.status = Job.Status.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ""
+    job.locked_at = None
+    job.locked_by = ""
+    job.save(update_fields=["status", "attempts", "run_at", "last_error", "locked_at", "locked_by", "finished_at"])
+    return job.status == Job.Status.DONE
+
+
+def run_pending(batch_size=10, worker=None):
+    """Exécute un lot de tâches dues. Renvoie le nombre de tâches traitées."""
+    jobs = claim(batch_size, worker)
+    for job in jobs:
+        execute(job)
+    return len(jobs)
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Notification, NotificationPreference
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "recipient", "ticket", "kind", "created_at", "sent_at")
+    list_filter = ("kind",)
+    raw_id_fields = ("recipient", "ticket")
+    ordering = ("-id",)
+
+
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ("user", "email_enabled", "on_assignment", "on_status", "on_comment", "digest_minutes")
+    raw_id_fields = ("user",)
@@ -0,0 +1,124 @@
+"""
+Notifications regroupées (digest).
+
+`notify()` enregistre un évènement par destinataire. Les envois sont faits par
+la tâche `notifications.flush` : chaque destinataire reçoit un seul email
+résumant tout ce qui s'est passé depuis sa première notification en attente
+(fenêtre configurable), et tous les emails d'un passage partent sur la même
+connexion SMTP.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Min
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from jobs.queue import enqueue, task
+from .models import Notification, NotificationPreference
+
+DEFAULT_WINDOW = getattr(settings, "NOTIFICATIONS_DIGEST_WINDOW", 300)  # secondes
+BATCH_SIZE = getattr(settings, "NOTIFICATIONS_BATCH_SIZE", 200)         # emails par connexion SMTP
+
+
+def _window(pref):
+    if pref is not None and pref.digest_minutes is not None:
+        return timedelta(minutes=pref.digest_minutes)
+    return timedelta(seconds=DEFAULT_WINDOW)
+
+
+def _schedule_flush(when):
+    # une seule tâche par seconde d'échéance, quel que soit le nombre d'évènements
+    when = when.replace(microsecond=0) + timedelta(seconds=1)
+    enqueue("notifications.flush", run_at=when, key=f"notifications-flush:{when.isoformat()}")
+
+
+def notify(kind, ticket, actor, recipients, message):
+    """Enregistre un évènement pour chaque destinataire (hors auteur, selon ses préférences)."""
+    users = {u.pk: u for u in recipients if u is not None and u.is_active and u.email}
+    users.pop(getattr(actor, "pk", None), None)
+    if not users:
+        return []
+
+    prefs = {p.user_id: p for p in NotificationPreference.objects.filter(user_id__in=users)}
+    rows = [
+        Notification(recipient_id=pk, ticket=ticket, kind=kind, message=message[:300])
+        for pk in users
+        if prefs.get(pk) is None or prefs[pk].wants(kind)
+    ]
+    if not rows:
+        return []
+    Notification.objects.bulk_create(rows)
+
+    now = timezone.now()
+    for when in {now + _window(prefs.get(n.recipient_id)) for n in rows}:
+        _schedule_flush(when)
+    return rows
+
+
+def _subject(notifs):
+    n_tickets = len({n.ticket_id for n in notifs})
+    if len(notifs) == 1:
+        return f"[Ticketarr] {notifs[0].message}"
+    return f"[Ticketarr] {len(notifs)} mises à jour sur {n_tickets} ticket(s)"
+
+
+def build_message(user, notifs):
+    tickets = {}
+    for n in notifs:
+        tickets.setdefault(n.ticket, []).append(n)
+    body = render_to_string("notifications/digest_email.txt", {
+        "user": user,
+        "tickets": tickets.items(),
+        "site_url": getattr(settings, "SITE_URL", "").rstrip("/"),
+    })
+    return EmailMessage(_subject(notifs), body, to=[user.email])
+
+
+def deliver_due(now=None):
+    """
+    Envoie les digests dont la fenêtre est écoulée. Renvoie (emails envoyés,
+    prochaine échéance ou None).
+    """
+    now = now or timezone.now()
+    pending = (Notification.objects.filter(sent_at__isnull=True)
+               .values("recipient_id").annotate(oldest=Min("created_at")))
+    prefs = {p.user_id: p for p in NotificationPreference.objects.filter(
+        user_id__in=[row["recipient_id"] for row in pending])}
+
+    due, next_due = [], None
+    for row in pending:
+        ready_at = row["oldest"] + _window(prefs.get(row["recipient_id"]))
+        if ready_at <= now:
+            due.append(row["recipient_id"])
+        elif next_due is None or ready_at < next_due:
+            next_due = ready_at
+
+    sent = 0
+    for i in range(0, len(due), BATCH_SIZE):
+        chunk = due[i:i + BATCH_SIZE]
+        with transaction.atomic():
+            notifs = list(Notification.objects.select_for_update(skip_locked=True)
+                          .filter(recipient_id__in=chunk, sent_at__isnull=True, created_at__lte=now)
+                          .select_related("recipient", "ticket")
+                          .order_by("recipient_id", "created_at"))
+            by_user = {}
+            for n in notifs:
+                by_user.setdefault(n.recipient, []).append(n)
+            if not by_user:
+                continue
+            messages = [build_message(user, items) for user, items in by_user.items()]
+            # une connexion ouverte pour tout le lot
+            with get_connection() as connection:
+                sent += connection.send_messages(messages) or 0
+            Notification.objects.filter(pk__in=[n.pk for n in notifs]).update(sent_at=now)
+    return sent, next_due
+
+
+@task("notifications.flush")
+def flush():
+    _, next_due = deliver_due()
+    if next_due is not None:
+        _schedule_flush(next_due)
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tickets', '0003_ticket_similarity_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_enabled', models.BooleanField(default=True, verbose_name='Recevoir les notifications par email')),
+                ('on_assignment', models.BooleanField(default=True, verbose_name='Assignations')),
+                ('on_status', models.BooleanField(default=True, verbose_name='Changements de statut')),
+                ('on_comment', models.BooleanField(default=True, verbose_name='Nouveaux messages')),
+                ('digest_minutes', models.PositiveIntegerField(blank=True, help_text='Vide = valeur par défaut du serveur.', null=True, verbose_name='Regrouper les notifications sur (minutes)')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_preference', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ASG', 'Assignation'), ('STA', 'Changement de statut'), ('COM', 'Nouveau message')], max_length=3)),
+                ('message', models.CharField(max_length=300)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='tickets.ticket')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['recipient', 'created_at'], name='notif_pending_idx')],
+            },
+        ),
+    ]
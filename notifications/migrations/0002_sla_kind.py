@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('ASG', 'Assignation'), ('STA', 'Changement de statut'), ('COM', 'Nouveau message'), ('SLA', 'Échéance SLA')], max_length=3),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+
+class Notification(models.Model):
+    class Kind(models.TextChoices):
+        ASSIGNMENT = "ASG", "Assignation"
+        STATUS = "STA", "Changement de statut"
+        COMMENT = "COM", "Nouveau message"
+        SLA = "SLA", "Échéance SLA"
+
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
+    ticket = models.ForeignKey("tickets.Ticket", on_delete=models.CASCADE, related_name="notifications")
+    kind = models.CharField(max_length=3, choices=Kind.choices)
+    message = models.CharField(max_length=300)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # seules les notifications pas encore envoyées sont parcourues
+            models.Index(fields=["recipient", "created_at"], condition=Q(sent_at__isnull=True),
+                         name="notif_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.recipient} (Ticket #{self.ticket_id})"
+
+
+class NotificationPreference(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notification_preference")
+    email_enabled = models.BooleanField("Recevoir les notifications par email", default=True)
+    on_assignment = models.BooleanField("Assignations", default=True)
+    on_status = models.BooleanField("Changements de statut", default=True)
+    on_comment = models.BooleanField("Nouveaux messages", default=True)
+    digest_minutes = models.PositiveIntegerField(
+        "Regrouper les notifications sur (minutes)", null=True, blank=True,
+        help_text="Vide = valeur par défaut du serveur.",
+    )
+
+    def __str__(self):
+        return f"Préférences de {self.user}"
+
+    def wants(self, kind):
+        return self.email_enabled and {
+            Notification.Kind.ASSIGNMENT: self.on_assignment,
+            Notification.Kind.STATUS: self.on_status,
+            Notification.Kind.COMMENT: self.on_comment,
+        }.get(kind, True)
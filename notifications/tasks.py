@@ -0,0 +1,2 @@
+# tâches découvertes par jobs.apps (autodiscover_modules("tasks"))
+from .digest import flush  # noqa: F401
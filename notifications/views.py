@@ -0,0 +1,23 @@
+from django import forms
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+
+from .models import NotificationPreference
+
+
+class NotificationPreferenceForm(forms.ModelForm):
+    class Meta:
+        model = NotificationPreference
+        fields = ["email_enabled", "on_assignment", "on_status", "on_comment", "digest_minutes"]
+
+
+@login_required
+def preferences(request):
+    pref, _ = NotificationPreference.objects.get_or_create(user=request.user)
+    form = NotificationPreferenceForm(request.POST or None, instance=pref)
+    if request.method == "POST" and form.is_valid():
+        form.save()
+        messages.success(request, "Préférences de notification enregistrées.")
+        return redirect("notifications:preferences")
+    return render(request, "notifications/preferences.html", {"form": form})
@@ -0,0 +1,145 @@
+"""
+Fil d'activité global (fan-out à la lecture).
+
+Pas de table d'évènements : on lit les N plus récents tickets et les N plus
+récents messages (dont les messages système d'assignation / de statut) via
+les index sur (created_at, id), puis on fusionne les deux flux triés en
+Python. Chaque page est repérée par un curseur (date, flux, id) : jamais
+d'OFFSET ni d'UNION triée sur les tables complètes, et le polling « plus
+récent que » ne lit que les nouvelles lignes.
+"""
+import heapq
+from datetime import datetime
+
+from django.db.models import Q
+
+from .models import Ticket, Comment
+
+# rang de chaque flux pour départager deux évènements à la même date
+COMMENT, TICKET = 0, 1
+
+# type d'évènement enregistré sur le message -> "kind" renvoyé au client
+EVENT_KINDS = {
+    Comment.Event.MESSAGE: "comment",
+    Comment.Event.ASSIGNMENT: "assignment",
+    Comment.Event.STATUS: "status",
+    Comment.Event.SLA: "sla",
+}
+
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(at, stream, pk):
+    return f"{at.isoformat()}~{stream}~{pk}"
+
+
+def decode_cursor(value):
+    try:
+        # un « + » de fuseau non encodé dans l'URL arrive en espace
+        at, stream, pk = value.replace(" ", "+").split("~")
+        return datetime.fromisoformat(at), int(stream), int(pk)
+    except (AttributeError, ValueError) as exc:
+        raise InvalidCursor(value) from exc
+
+
+def _cursor_q(stream, cursor, newer):
+    """Lignes d'un flux strictement avant (ou après) le curseur, dans l'ordre (date, flux, id)."""
+    at, cursor_stream, pk = cursor
+    if newer:
+        q = Q(created_at__gt=at)
+        if stream > cursor_stream:
+            q |= Q(created_at=at)
+        elif stream == cursor_stream:
+            q |= Q(created_at=at, pk__gt=pk)
+    else:
+        q = Q(created_at__lt=at)
+        if stream < cursor_stream:
+            q |= Q(created_at=at)
+        elif stream == cursor_stream:
+            q |= Q(created_at=at, pk__lt=pk)
+    return q
+
+
+def _ticket_filters(filters, prefix=""):
+    q = Q()
+    for field in ("project", "client", "assignee"):
+        if filters.get(field):
+            q &= Q(**{f"{prefix}{field}_id": filters[field]})
+    return q
+
+
+def _ticket_event(t):
+    return {
+        "kind": "ticket",
+        "label": "Nouveau ticket",
+        "at": t.created_at,
+        "ticket_id": t.pk,
+        "ticket_title": t.title,
+        "project": t.project.name,
+        "actor": t.reporter.get_username(),
+        "text": t.title,
+        "url": t.get_absolute_url(),
+        "cursor": encode_cursor(t.created_at, TICKET, t.pk),
+    }
+
+
+def _comment_event(c):
+    event = Comment.Event(c.event)
+    return {
+        "kind": EVENT_KINDS[event],
+        "label": event.label,
+        "at": c.created_at,
+        "ticket_id": c.ticket_id,
+        "ticket_title": c.ticket.title,
+        "project": c.ticket.project.name,
+        "actor": c.author.get_username(),
+        "text": c.body,
+        "url": c.ticket.get_absolute_url(),
+        "cursor": encode_cursor(c.created_at, COMMENT, c.pk),
+    }
+
+
+def _key(event):
+    stream, pk = event["cursor"].split("~")[1:]
+    return event["at"], int(stream), int(pk)
+
+
+def feed(filters=None, before=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    Évènements du plus récent au plus ancien (ou, avec `after`, seulement les
+    plus récents que ce curseur). Renvoie (évènements, curseur suivant ou None).
+    """
+    filters = filters or {}
+    limit = max(1, min(limit, MAX_LIMIT))
+    newer = after is not None
+    cursor = decode_cursor(after if newer else before) if (after or before) else None
+    direction = "" if newer else "-"
+
+    tickets = (Ticket.objects.filter(_ticket_filters(filters))
+               .select_related("reporter", "project")
+               .order_by(f"{direction}created_at", f"{direction}pk"))
+    comments = (Comment.objects.filter(_ticket_filters(filters, "ticket__"))
+                .select_related("author", "ticket__project")
+                .order_by(f"{direction}created_at", f"{direction}pk"))
+    if cursor:
+        tickets = tickets.filter(_cursor_q(TICKET, cursor, newer))
+        comments = comments.filter(_cursor_q(COMMENT, cursor, newer))
+
+    # au plus limit + 1 lignes par flux : assez pour savoir s'il en reste
+    streams = (
+        [_ticket_event(t) for t in tickets[:limit + 1]],
+        [_comment_event(c) for c in comments[:limit + 1]],
+    )
+    merged = list(heapq.merge(*streams, key=_key, reverse=not newer))
+    page, more = merged[:limit], len(merged) > limit
+
+    if newer:
+        # du plus récent au plus ancien, curseur = le plus récent reçu
+        page.reverse()
+        return page, (page[0]["cursor"] if page else after)
+    return page, (page[-1]["cursor"] if more else None)
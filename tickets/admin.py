@@ -1,6 +1,167 @@
-from django.contrib import admin
-from .models import Project, Ticket, Comment, Client
-admin.site.register(Project)
-admin.site.register(Ticket)
-admin.site.register(Comment)
-admin.site.register(Client)
+import json
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connection
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+
+from .models import Project, Ticket, Comment, Client, Attachment, SLAPolicy
+from . import client_lookup, transitions
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Évite le COUNT(*) complet sur les grosses tables : au-delà de EXACT_LIMIT
+    lignes on prend l'estimation du planificateur Postgres (EXPLAIN), qui
+    s'appuie sur les statistiques et les index plutôt que de tout parcourir.
+    """
+    EXACT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if connection.vendor != "postgresql" or not hasattr(qs, "query"):
+            return super().count
+        sql, params = qs.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < self.EXACT_LIMIT:
+            return super().count
+        return estimate
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # pas de second COUNT(*) « sur N au total »
+    list_per_page = 50
+
+
+class PaginatedCommentFormSet(BaseInlineFormSet):
+    per_page = 20
+    page = 1
+
+    def get_queryset(self):
+        if not hasattr(self, "_page_queryset"):
+            qs = super().get_queryset().select_related("author").order_by("-created_at", "-pk")
+            self.total = qs.count()
+            self.num_pages = max(1, -(-self.total // self.per_page))
+            self.page = min(max(1, self.page), self.num_pages)
+            start = (self.page - 1) * self.per_page
+            self._page_queryset = qs[start:start + self.per_page]
+        return self._page_queryset
+
+
+class CommentInline(admin.TabularInline):
+    """Messages du ticket en lecture seule, 20 par page (?comments_page=N)."""
+    model = Comment
+    formset = PaginatedCommentFormSet
+    template = "admin/tickets/ticket/comment_inline.html"
+    fields = ("created_at", "author", "is_system", "body")
+    readonly_fields = fields
+    extra = 0
+    max_num = 0
+    can_delete = False
+    show_change_link = True
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            formset.page = int(request.GET.get("comments_page", 1))
+        except ValueError:
+            formset.page = 1
+        return formset
+
+
+@admin.register(Project)
+class ProjectAdmin(ScalableAdmin):
+    list_display = ("name",)
+    search_fields = ("name",)
+    ordering = ("name",)
+    autocomplete_fields = ("developers",)
+
+
+@admin.register(Client)
+class ClientAdmin(ScalableAdmin):
+    list_display = ("name", "company", "phone_number")
+    search_fields = ("name", "company", "phone_digits")
+
+    def get_search_results(self, request, queryset, search_term):
+        # même recherche que la liste des clients : numéro normalisé, index pg_trgm
+        return client_lookup.search_clients(search_term, queryset), False
+
+
+@admin.register(Ticket)
+class TicketAdmin(ScalableAdmin):
+    list_display = ("id", "title", "status", "priority", "client", "project", "assignee", "created_at")
+    list_display_links = ("id", "title")
+    list_select_related = ("client", "project", "assignee")
+    # uniquement des colonnes indexées (cf. Ticket.Meta.indexes)
+    list_filter = ("status", "priority", "created_at", "project")
+    # sous-ensemble de la recherche de TicketListView : ni la description (texte
+    # long, parcours complet) ni les noms d'utilisateurs (jointures en plus)
+    search_fields = ("=id", "title", "client__name", "client__company", "project__name")
+    autocomplete_fields = ("client", "project", "reporter", "assignee")
+    # statut : uniquement via les actions (transitions.apply : UPDATE conditionnel, historique, cache)
+    readonly_fields = ("status", "created_at", "updated_at", "closed_at", "responded_at",
+                       "sla_warned_at", "response_escalated_at", "resolution_escalated_at")
+    ordering = ("-created_at",)
+    inlines = [CommentInline]
+    actions = ["close_tickets", "resolve_tickets", "reopen_tickets"]
+
+    def _transition(self, request, queryset, name):
+        # un UPDATE conditionnel par ticket : ceux modifiés entre-temps sont ignorés
+        try:
+            done = transitions.apply_many(queryset, name, request.user)
+        except PermissionDenied as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        skipped = len(queryset) - len(done)
+        self.message_user(request, f"{len(done)} ticket(s) modifié(s), {skipped} ignoré(s).", messages.SUCCESS)
+
+    @admin.action(description="Fermer les tickets sélectionnés")
+    def close_tickets(self, request, queryset):
+        self._transition(request, queryset, "close")
+
+    @admin.action(description="Résoudre les tickets sélectionnés")
+    def resolve_tickets(self, request, queryset):
+        self._transition(request, queryset, "resolve")
+
+    @admin.action(description="Rouvrir les tickets sélectionnés")
+    def reopen_tickets(self, request, queryset):
+        self._transition(request, queryset, "reopen")
+
+
+@admin.register(SLAPolicy)
+class SLAPolicyAdmin(admin.ModelAdmin):
+    list_display = ("priority", "client", "project", "response_minutes", "resolution_minutes")
+    list_select_related = ("client", "project")
+    list_filter = ("priority",)
+    autocomplete_fields = ("client", "project")
+    ordering = ("priority", "client", "project")
+
+
+@admin.register(Comment)
+class CommentAdmin(ScalableAdmin):
+    list_display = ("id", "ticket", "author", "is_system", "created_at")
+    list_select_related = ("ticket", "author")
+    # pas de list_filter sur is_system : colonne non indexée, parcours de toute la table
+    search_fields = ("=ticket__id",)
+    raw_id_fields = ("ticket",)
+    autocomplete_fields = ("author",)
+    ordering = ("-id",)
+
+
+@admin.register(Attachment)
+class AttachmentAdmin(ScalableAdmin):
+    list_display = ("id", "filename", "ticket", "content_type", "uploaded_by", "created_at")
+    list_select_related = ("ticket", "uploaded_by")
+    search_fields = ("=ticket__id", "filename")
+    raw_id_fields = ("ticket", "comment", "blob")
+    autocomplete_fields = ("uploaded_by",)
+    ordering = ("-id",)
@@ -0,0 +1,131 @@
+"""
+Assignation automatique des tickets OPEN.
+
+La charge d'un développeur = somme des poids de priorité de ses tickets
+OPEN/WIP. Les devs sont rangés dans un tas (heapq) trié par charge : le
+moins chargé sort en O(log n), les entrées périmées sont ignorées au pop.
+"""
+import heapq
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, When, Value, IntegerField, Sum, Q
+from django.db.models.functions import Coalesce
+
+from .models import Ticket, Project
+from . import transitions
+
+User = get_user_model()
+
+PRIORITY_WEIGHTS = {
+    Ticket.Priority.URGENT: 8,
+    Ticket.Priority.HIGH: 4,
+    Ticket.Priority.MEDIUM: 2,
+    Ticket.Priority.LOW: 1,
+}
+
+ACTIVE_STATUSES = [Ticket.Status.OPEN, Ticket.Status.IN_PROGRESS]
+
+
+def _weight(prefix=""):
+    return Case(
+        *[When(**{f"{prefix}priority": code}, then=Value(w)) for code, w in PRIORITY_WEIGHTS.items()],
+        default=Value(1), output_field=IntegerField(),
+    )
+
+
+def assign_ticket(ticket, assignee, by):
+    """Assigne + passe en cours (transition "assign"). False si le ticket a changé entre-temps."""
+    return transitions.apply(ticket, "assign", by, assignee=assignee)
+
+
+class AssignmentEngine:
+    """Photo des charges des devs actifs, mise à jour au fil des assignations."""
+
+    def __init__(self):
+        devs = (User.objects.filter(role="DEV", is_active=True)
+                .annotate(load=Coalesce(Sum(
+                    _weight("assigned_tickets__"),
+                    filter=Q(assigned_tickets__status__in=ACTIVE_STATUSES),
+                ), 0)))
+        self.developers = {d.pk: d for d in devs}
+        self.loads = {d.pk: d.load for d in devs}
+        self._heap = [(load, pk) for pk, load in self.loads.items()]
+        heapq.heapify(self._heap)
+        self._eligible = {}
+
+    def _eligible_for(self, project_id):
+        # None = pas de restriction sur le projet
+        if project_id not in self._eligible:
+            ids = set(Project.developers.through.objects
+                      .filter(project_id=project_id)
+                      .values_list("user_id", flat=True))
+            self._eligible[project_id] = ids or None
+        return self._eligible[project_id]
+
+    def _least_loaded(self, project_id):
+        eligible = self._eligible_for(project_id)
+        skipped = []
+        try:
+            while self._heap:
+                load, pk = self._heap[0]
+                if self.loads[pk] != load:
+                    heapq.heappop(self._heap)  # entrée périmée
+                    continue
+                if eligible is None or pk in eligible:
+                    return pk
+                skipped.append(heapq.heappop(self._heap))
+            return None
+        finally:
+            for item in skipped:
+                heapq.heappush(self._heap, item)
+
+    def pick(self, ticket):
+        """Choisit le dev le moins chargé pour `ticket` et lui impute le ticket."""
+        pk = self._least_loaded(ticket.project_id)
+        if pk is None:
+            return None
+        self.loads[pk] += PRIORITY_WEIGHTS.get(ticket.priority, 1)
+        heapq.heappush(self._heap, (self.loads[pk], pk))
+        return self.developers[pk]
+
+    def plan(self, tickets):
+        return [(t, self.pick(t)) for t in tickets]
+
+
+def backlog(project=None):
+    """Tickets OPEN sans dev, les plus urgents puis les plus anciens d'abord."""
+    qs = (Ticket.objects.filter(status=Ticket.Status.OPEN, assignee__isnull=True)
+          .annotate(weight=_weight())
+          .order_by("-weight", "created_at", "pk"))
+    if project is not None:
+        qs = qs.filter(project=project)
+    return qs
+
+
+def auto_assign(ticket, by):
+    """Assigne un ticket OPEN au dev le moins chargé. Renvoie le dev ou None."""
+    if ticket.status != Ticket.Status.OPEN or ticket.assignee_id:
+        return None
+    with transaction.atomic():
+        dev = AssignmentEngine().pick(ticket)
+        if dev is not None and not assign_ticket(ticket, dev, by):
+            dev = None  # déjà pris en charge entre-temps
+    return dev
+
+
+def drain_backlog(by, project=None, dry_run=False):
+    """
+    Répartit tout le backlog OPEN en une transaction : un UPDATE par
+    développeur (transitions.assign_many), pas un par ticket.
+    Renvoie la liste [(ticket, dev)] ; dev vaut None si personne n'est éligible.
+    """
+    if dry_run:
+        return AssignmentEngine().plan(backlog(project).select_related("project"))
+
+    with transaction.atomic():
+        # les tickets déjà verrouillés par un autre drain/assign sont ignorés
+        tickets = list(backlog(project).select_for_update(skip_locked=True))
+        plan = AssignmentEngine().plan(tickets)
+        transitions.assign_many(plan, by)
+    return plan
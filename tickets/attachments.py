@@ -0,0 +1,184 @@
+"""
+Pièces jointes : stockage adressé par contenu (SHA-256) sous ATTACHMENTS_ROOT.
+
+Les uploads sont écrits en flux directement sur disque par un upload handler
+qui calcule l'empreinte au passage (rien n'est gardé en mémoire). Un fichier
+déjà connu n'est stocké qu'une fois, quel que soit le nombre de tickets.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import IntegrityError, transaction
+
+from .models import Blob, Attachment
+
+ROOT = settings.ATTACHMENTS_ROOT
+MAX_SIZE = settings.ATTACHMENTS_MAX_SIZE
+THUMB_SIZE = 256
+
+
+def blob_path(sha256):
+    return os.path.join(ROOT, "blobs", sha256[:2], sha256[2:4], sha256)
+
+
+def thumb_path(sha256):
+    return os.path.join(ROOT, "thumbs", sha256[:2], f"{sha256}-{THUMB_SIZE}.png")
+
+
+class HashedUpload(UploadedFile):
+    """Fichier reçu : déjà sur disque (temp_path), empreinte calculée."""
+
+    def __init__(self, temp_path, sha256, name, content_type, size, charset=None):
+        super().__init__(file=None, name=name, content_type=content_type, size=size, charset=charset)
+        self.temp_path = temp_path
+        self.sha256 = sha256
+
+    def discard(self):
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+    def close(self):
+        # appelé par Django en fin de requête : supprime le temporaire s'il n'a pas été rangé
+        self.discard()
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Écrit chaque chunk dans ROOT/tmp et calcule le SHA-256 au fil de l'eau."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        tmp_dir = os.path.join(ROOT, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.tmp = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > MAX_SIZE:
+            self._cleanup()
+            # signalé à la vue (rejected_upload) ; le reste du corps est lu et jeté
+            # pour que le navigateur reçoive la page d'erreur
+            self.request.rejected_upload = self.file_name
+            raise StopUpload(connection_reset=False)
+        self.tmp.write(raw_data)
+        self.hasher.update(raw_data)
+        return None  # chunk consommé, on ne le passe pas aux handlers suivants
+
+    def file_complete(self, file_size):
+        self.tmp.close()
+        return HashedUpload(
+            self.tmp.name, self.hasher.hexdigest(), self.file_name,
+            _content_type(self.file_name, self.content_type), self.size, self.charset,
+        )
+
+    def upload_interrupted(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        tmp = getattr(self, "tmp", None)
+        if tmp is not None:
+            tmp.close()
+            if os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+
+
+def _content_type(filename, declared):
+    guessed, _ = mimetypes.guess_type(filename)
+    return guessed or declared or "application/octet-stream"
+
+
+def store(upload):
+    """Range le fichier reçu dans le stockage adressé par contenu, renvoie le Blob."""
+    final = blob_path(upload.sha256)
+    if os.path.exists(final):
+        upload.discard()  # déjà connu : on garde l'existant
+    else:
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(upload.temp_path, final)  # même volume : renommage atomique
+    try:
+        with transaction.atomic():
+            blob, _ = Blob.objects.get_or_create(sha256=upload.sha256, defaults={"size": upload.size})
+    except IntegrityError:
+        blob = Blob.objects.get(sha256=upload.sha256)
+    return blob
+
+
+def attach_uploads(files, ticket, user, comment=None):
+    created = []
+    for upload in files:
+        if not isinstance(upload, HashedUpload):
+            continue
+        blob = store(upload)
+        created.append(Attachment.objects.create(
+            ticket=ticket,
+            comment=comment,
+            blob=blob,
+            filename=os.path.basename(upload.name)[:255],
+            content_type=upload.content_type[:100],
+            uploaded_by=user,
+        ))
+    return created
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """Une seule plage `bytes=a-b` → (début, fin incluse) ; None si absente ou invalide."""
+    m = _RANGE_RE.match((header or "").strip())
+    if not m or (m.group(1) == "" and m.group(2) == ""):
+        return None
+    if m.group(1) == "":
+        length = int(m.group(2))  # bytes=-N : les N derniers octets
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(m.group(1))
+    end = int(m.group(2)) if m.group(2) else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def iter_file(path, start, length, chunk_size=64 * 1024):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def thumbnail(attachment):
+    """Miniature PNG générée à la première demande puis gardée sur disque (None si impossible)."""
+    if not attachment.is_image:
+        return None
+    path = thumb_path(attachment.blob_id)
+    if os.path.exists(path):
+        return path
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with Image.open(blob_path(attachment.blob_id)) as img:
+            img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+            img.save(tmp, "PNG")
+        os.replace(tmp, path)
+    except (OSError, Image.DecompressionBombError, ValueError):
+        return None  # image corrompue, trop grande ou format non géré
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return path
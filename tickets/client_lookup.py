@@ -0,0 +1,50 @@
+"""
+Recherche rapide de clients (appel entrant, liste des clients).
+
+- un numéro (au moins 3 chiffres) est cherché par sous-chaîne sur phone_digits
+  (index pg_trgm), les numéros qui commencent par ces chiffres en premier :
+  formats "06 12 34 56 78", "+33612345678" et "0612345678" se valent ;
+- un texte est cherché sur le nom et la société avec pg_trgm (index GIN) :
+  similarité (fautes de frappe) ou sous-chaîne, classé par similarité.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q, Case, When, IntegerField
+from django.db.models.functions import Greatest
+
+from .models import Client, normalize_phone
+
+MIN_PHONE_DIGITS = 3
+
+
+def looks_like_phone(q):
+    digits = re.sub(r"\D", "", q)
+    return len(digits) >= MIN_PHONE_DIGITS and len(digits) * 2 >= len(re.sub(r"\s", "", q))
+
+
+def search_clients(q, qs=None):
+    """QuerySet des clients correspondant à `q`, les plus pertinents d'abord."""
+    qs = Client.objects.all() if qs is None else qs
+    q = q.strip()
+    if not q:
+        return qs
+    if looks_like_phone(q):
+        digits = normalize_phone(q)
+        return (qs.filter(phone_digits__contains=digits)
+                .annotate(prefix=Case(When(phone_digits__startswith=digits, then=0), default=1,
+                                      output_field=IntegerField()))
+                .order_by("prefix", "phone_digits", "name"))
+
+    text = Q(name__icontains=q) | Q(company__icontains=q)
+    if connection.vendor != "postgresql":
+        return qs.filter(text)
+
+    from django.contrib.postgres.search import TrigramSimilarity
+    return (qs.filter(text | Q(name__trigram_similar=q) | Q(company__trigram_similar=q))
+            .annotate(similarity=Greatest(TrigramSimilarity("name", q), TrigramSimilarity("company", q)))
+            .order_by("-similarity", "company", "name"))
+
+
+def lookup_clients(q, limit=10):
+    return list(search_clients(q)[:limit])
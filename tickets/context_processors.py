@@ -0,0 +1,8 @@
+from . import inbox
+
+
+def inbox_badge(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"inbox_unread": inbox.unread_total(user)}
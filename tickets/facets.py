@@ -0,0 +1,114 @@
+"""
+Compteurs de facettes pour la liste des tickets.
+
+Chaque facette (statut, priorité, client, projet) est comptée sur la recherche
+courante en appliquant les filtres des *autres* facettes (faceting standard).
+Sous Postgres tout est calculé en une requête GROUPING SETS avec des
+COUNT(*) FILTER (...), bornée par un statement_timeout : si le budget est
+dépassé on renvoie None et la page s'affiche sans compteurs. Le résultat est
+mis en cache (espace "tickets", invalidé à chaque modification) ; un
+dépassement aussi, brièvement, pour ne pas repayer le budget à chaque
+affichage de la liste.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count
+
+from helpdesk.cache import two_tier
+
+# facette -> colonne de tickets_ticket
+FACETS = {
+    "status": "status",
+    "priority": "priority",
+    "client": "client_id",
+    "project": "project_id",
+}
+
+BUDGET_MS = getattr(settings, "TICKET_FACETS_BUDGET_MS", 250)
+CACHE_SECONDS = getattr(settings, "TICKET_FACETS_CACHE_SECONDS", 300)
+TIMED_OUT_SECONDS = getattr(settings, "TICKET_FACETS_TIMED_OUT_SECONDS", 60)
+
+TIMED_OUT = "timed-out"  # valeur en cache : budget dépassé récemment
+QUERY_CANCELED = "57014"  # SQLSTATE de statement_timeout
+
+
+def _others(selected, facet):
+    return {f: vals for f, vals in selected.items() if vals and f != facet}
+
+
+def _grouping_sets(base_qs, selected):
+    inner_sql, inner_params = (base_qs.order_by()
+                               .values(*FACETS.values())
+                               .query.sql_with_params())
+    counts, params = [], []
+    for facet in FACETS:
+        others = _others(selected, facet)
+        if not others:
+            counts.append("COUNT(*)")
+            continue
+        conds = []
+        for f, vals in others.items():
+            conds.append(f"s.{FACETS[f]} = ANY(%s)")
+            params.append(list(vals))
+        counts.append(f"COUNT(*) FILTER (WHERE {' AND '.join(conds)})")
+
+    cols = ", ".join(f"s.{c}" for c in FACETS.values())
+    sql = (
+        f"SELECT {cols}, {', '.join(counts)} "
+        f"FROM ({inner_sql}) s "
+        f"GROUP BY GROUPING SETS ({', '.join(f'(s.{c})' for c in FACETS.values())})"
+    )
+
+    out = {facet: {} for facet in FACETS}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL statement_timeout = %s", [BUDGET_MS])
+        cursor.execute(sql, params + list(inner_params))
+        n = len(FACETS)
+        for row in cursor.fetchall():
+            keys, values = row[:n], row[n:]
+            # toutes les colonnes sont NOT NULL : la seule non nulle désigne l'ensemble
+            for i, facet in enumerate(FACETS):
+                if keys[i] is not None:
+                    out[facet][keys[i]] = values[i]
+    return out
+
+
+def _per_facet(base_qs, selected):
+    # repli hors Postgres : une requête groupée par facette
+    out = {}
+    for facet, column in FACETS.items():
+        qs = base_qs.order_by()
+        for f, vals in _others(selected, facet).items():
+            qs = qs.filter(**{f"{FACETS[f]}__in": vals})
+        out[facet] = dict(qs.values_list(column).annotate(n=Count("pk")))
+    return out
+
+
+def facet_counts(base_qs, selected):
+    """
+    base_qs : tickets filtrés par la recherche seule ; selected : {facette: [valeurs]}.
+    Renvoie {facette: {valeur: nombre}} ou None si le budget de temps est dépassé.
+    """
+    sql, params = base_qs.order_by().values("pk").query.sql_with_params()
+    fingerprint = repr((sql, params, sorted((f, sorted(map(str, v))) for f, v in selected.items())))
+    key = "facets:" + hashlib.md5(fingerprint.encode()).hexdigest()
+
+    gen = two_tier.generation("tickets")  # lue avant le calcul (cf. helpdesk/cache.py)
+    counts = two_tier.get("tickets", key, gen=gen)
+    if counts is not None:
+        return None if counts == TIMED_OUT else counts
+    try:
+        if connection.vendor == "postgresql":
+            counts = _grouping_sets(base_qs, selected)
+        else:
+            counts = _per_facet(base_qs, selected)
+    except OperationalError as e:
+        if getattr(e.__cause__, "pgcode", None) != QUERY_CANCELED:
+            raise
+        # statement_timeout atteint : pas de compteurs plutôt qu'une page lente
+        two_tier.set("tickets", key, TIMED_OUT, TIMED_OUT_SECONDS, gen=gen)
+        return None
+    two_tier.set("tickets", key, counts, CACHE_SECONDS, gen=gen)
+    return counts
@@ -0,0 +1,43 @@
+from django.utils.html import escape
+
+from .models import Ticket, Comment
+
+
+def _log_status_change(ticket, user, old_code, new_code):
+    # labels lisibles
+    old_label = Ticket.Status(old_code).label if old_code else "—"
+    new_label = Ticket.Status(new_code).label if new_code else "—"
+    msg = f"🛈 Statut changé : {escape(old_label)} → {escape(new_label)} par {escape(user.get_username())}"
+    Comment.objects.create(ticket=ticket, author=user, body=msg, is_system=True, event=Comment.Event.STATUS)
+
+def _log_assignment(ticket, user, assignee):
+    who = escape(assignee.get_username()) if assignee else "—"
+    by  = escape(user.get_username())
+    msg = f"🛠️ Assigné à {who} par {by}"
+    Comment.objects.create(ticket=ticket, author=user, body=msg, is_system=True, event=Comment.Event.ASSIGNMENT)
+
+
+# --- Versions différées (file de tâches), pour sortir les logs du chemin de la requête ---
+def status_change_job(ticket, user, old_code, new_code):
+    return {
+        "name": "tickets.log_status_change",
+        "payload": {"ticket_id": ticket.pk, "by_id": user.pk, "old": old_code, "new": new_code},
+        "key": f"status:{ticket.pk}:{old_code}:{new_code}:{ticket.updated_at.isoformat()}",
+    }
+
+def assignment_job(ticket, user, assignee):
+    return {
+        "name": "tickets.log_assignment",
+        "payload": {"ticket_id": ticket.pk, "by_id": user.pk, "assignee_id": assignee.pk if assignee else None},
+        "key": f"assign:{ticket.pk}:{ticket.updated_at.isoformat()}",
+    }
+
+def log_status_change_later(ticket, user, old_code, new_code):
+    from jobs.queue import enqueue
+    job = status_change_job(ticket, user, old_code, new_code)
+    enqueue(job["name"], job["payload"], key=job["key"])
+
+def log_assignment_later(ticket, user, assignee):
+    from jobs.queue import enqueue
+    job = assignment_job(ticket, user, assignee)
+    enqueue(job["name"], job["payload"], key=job["key"])
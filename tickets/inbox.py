@@ -0,0 +1,46 @@
+"""
+Boîte de réception : tickets dont l'utilisateur est rapporteur ou assigné,
+avec le nombre de messages arrivés depuis sa dernière visite.
+
+Le compteur est calculé dans la même requête que la liste (jointure filtrée
+sur son marqueur de lecture + COUNT groupé), sans sous-requête par ligne.
+"""
+from django.core.cache import cache
+from django.db.models import Count, F, FilteredRelation, Q, Sum
+from django.utils import timezone
+
+from .models import Ticket, TicketReadMarker
+
+BADGE_TTL = 60  # secondes
+
+
+def badge_key(user_id):
+    return f"inbox-unread:{user_id}"
+
+
+def inbox_queryset(user):
+    unread = (
+        (Q(my_marker__last_read_at__isnull=True) | Q(comments__created_at__gt=F("my_marker__last_read_at")))
+        & ~Q(comments__author=user)
+    )
+    return (Ticket.objects
+            .filter(Q(assignee=user) | Q(reporter=user))
+            .annotate(my_marker=FilteredRelation("read_markers", condition=Q(read_markers__user=user)))
+            .annotate(unread=Count("comments", filter=unread)))
+
+
+def unread_total(user):
+    """Total affiché dans la barre de navigation, servi depuis le cache."""
+    def compute():
+        active = inbox_queryset(user).exclude(status=Ticket.Status.CLOSED)
+        return active.aggregate(total=Sum("unread"))["total"] or 0
+    return cache.get_or_set(badge_key(user.pk), compute, BADGE_TTL)
+
+
+def mark_read(user, ticket):
+    TicketReadMarker.objects.update_or_create(user=user, ticket=ticket, defaults={"last_read_at": timezone.now()})
+    cache.delete(badge_key(user.pk))
+
+
+def invalidate(*user_ids):
+    cache.delete_many([badge_key(pk) for pk in user_ids if pk])
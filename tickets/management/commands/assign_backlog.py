@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import assignment
+from tickets.models import Project
+
+
+class Command(BaseCommand):
+    help = "Assigne les tickets OPEN sans développeur au dev le moins chargé."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Utilisateur auteur des logs d'assignation")
+        parser.add_argument("--project", type=int, help="Limiter à un projet (id)")
+        parser.add_argument("--dry-run", action="store_true", help="Affiche le plan sans rien enregistrer")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        try:
+            by = User.objects.get(username=opts["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur inconnu : {opts['user']}")
+
+        project = None
+        if opts["project"]:
+            try:
+                project = Project.objects.get(pk=opts["project"])
+            except Project.DoesNotExist:
+                raise CommandError(f"Projet inconnu : {opts['project']}")
+
+        plan = assignment.drain_backlog(by, project=project, dry_run=opts["dry_run"])
+        for ticket, dev in plan:
+            self.stdout.write(f"#{ticket.pk} [{ticket.priority}] {ticket.title} -> {dev or '—'}")
+
+        done = sum(1 for _, dev in plan if dev)
+        verb = "à assigner" if opts["dry_run"] else "assigné(s)"
+        self.stdout.write(self.style.SUCCESS(f"{done}/{len(plan)} ticket(s) {verb}."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from tickets import similarity
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    help = "Regroupe les tickets ouverts/en cours quasi-identiques (MinHash/LSH)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=similarity.DEFAULT_THRESHOLD,
+                            help="Similarité de Jaccard estimée minimale (0-1)")
+        parser.add_argument("--reindex", action="store_true",
+                            help="Recalcule d'abord les signatures de tous les tickets")
+
+    def handle(self, *args, **opts):
+        if opts["reindex"]:
+            n = 0
+            for ticket in Ticket.objects.only("id", "title", "description").iterator(chunk_size=2000):
+                similarity.index_ticket(ticket)
+                n += 1
+            self.stdout.write(f"{n} ticket(s) indexé(s).")
+
+        clusters = similarity.duplicate_clusters(threshold=opts["threshold"])
+        titles = dict(Ticket.objects.filter(pk__in=[pk for c in clusters for pk in c])
+                      .values_list("pk", "title"))
+        for cluster in clusters:
+            self.stdout.write(self.style.WARNING(f"{len(cluster)} doublons probables :"))
+            for pk in cluster:
+                self.stdout.write(f"  #{pk} {titles.get(pk, '')}")
+        self.stdout.write(self.style.SUCCESS(f"{len(clusters)} groupe(s) de doublons."))
@@ -0,0 +1,59 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps jusqu'à la première réponse d'un process neuf (avec/sans préchauffage)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="/accounts/login/", help="URL demandée")
+        parser.add_argument("--runs", type=int, default=5, help="Nombre de process lancés")
+        parser.add_argument("--no-warmup", action="store_true", help="Mesure sans préchauffage")
+        parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **opts):
+        if opts["child"]:
+            return self._child(opts)
+
+        cmd = [sys.executable, sys.argv[0], "measure_startup", "--child", "--url", opts["url"]]
+        if opts["no_warmup"]:
+            cmd.append("--no-warmup")
+
+        totals, firsts, seconds = [], [], []
+        for _ in range(opts["runs"]):
+            start = time.perf_counter()
+            out = subprocess.run(cmd, capture_output=True, text=True)
+            total = (time.perf_counter() - start) * 1000
+            if out.returncode != 0:
+                raise CommandError(out.stderr.strip())
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            totals.append(total)
+            firsts.append(result["first"])
+            seconds.append(result["second"])
+
+        self.stdout.write(f"URL {opts['url']} — {opts['runs']} process, "
+                          f"préchauffage {'désactivé' if opts['no_warmup'] else 'activé'}")
+        for label, values in (("process → 1re réponse", totals),
+                              ("1re requête", firsts),
+                              ("2e requête", seconds)):
+            self.stdout.write(f"{label:<24} médiane {statistics.median(values):8.1f} ms"
+                              f"   max {max(values):8.1f} ms")
+
+    def _child(self, opts):
+        if not opts["no_warmup"]:
+            from helpdesk.warmup import warm_up
+            warm_up()
+        client = Client()
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            client.get(opts["url"])
+            timings.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(json.dumps({"first": timings[0], "second": timings[1]}))
@@ -0,0 +1,38 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from tickets import sla
+
+
+class Command(BaseCommand):
+    help = "Escalade les tickets dont l'échéance SLA est dépassée et avertit ceux qui en approchent."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Utilisateur auteur des messages d'escalade")
+        parser.add_argument("--once", action="store_true", help="Un seul passage puis s'arrête")
+        parser.add_argument("--interval", type=float, default=60.0, help="Attente (s) entre deux passages")
+        parser.add_argument("--batch", type=int, default=100, help="Tickets traités au plus par échéance et par passage")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        try:
+            by = User.objects.get(username=opts["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur inconnu : {opts['user']}")
+
+        try:
+            while True:
+                close_old_connections()
+                done = sla.escalate_due(by, batch=opts["batch"])
+                for ticket, action in done:
+                    self.stdout.write(f"#{ticket.pk} [{ticket.priority}] {ticket.title} : {action}")
+                # pas d'enchaînement immédiat même s'il reste du retard : au plus
+                # `batch` escalades (et notifications) par échéance et par passage
+                if opts["once"]:
+                    break
+                time.sleep(opts["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from helpdesk.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Précharge URLs, templates et connexions DB (comme au démarrage d'un worker)."
+
+    def handle(self, *args, **opts):
+        for step, (count, ms) in warm_up().items():
+            self.stdout.write(f"{step:<10} {count:>5}  {ms:8.1f} ms")
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='developers',
+            field=models.ManyToManyField(blank=True, limit_choices_to={'is_active': True, 'role': 'DEV'}, related_name='projects', to=settings.AUTH_USER_MODEL, verbose_name='Développeurs'),
+        ),
+    ]
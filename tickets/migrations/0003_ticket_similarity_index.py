@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_project_developers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSignature',
+            fields=[
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='tickets.ticket')),
+                ('minhash', models.JSONField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TicketBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='tickets.ticket')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='tickets_tic_band_942e94_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ticket', 'band'), name='uniq_ticket_band')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_attachments'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketReadMarker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['ticket', 'created_at'], name='tickets_com_ticket__f8cb69_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assignee', 'status'], name='tickets_tic_assigne_294cb9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['reporter', 'status'], name='tickets_tic_reporte_f395fc_idx'),
+        ),
+        migrations.AddField(
+            model_name='ticketreadmarker',
+            name='ticket',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to='tickets.ticket'),
+        ),
+        migrations.AddField(
+            model_name='ticketreadmarker',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketreadmarker',
+            constraint=models.UniqueConstraint(fields=('user', 'ticket'), name='uniq_read_marker'),
+        ),
+    ]
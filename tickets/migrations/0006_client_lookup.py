@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:26
+
+import re
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def normalize_phone(value):
+    # copie figée de tickets.models.normalize_phone à la date de cette migration
+    digits = re.sub(r"\D", "", value or "")
+    if digits.startswith("0033"):
+        digits = "0" + digits[4:]
+    elif digits.startswith("33") and (value or "").lstrip().startswith("+"):
+        digits = "0" + digits[2:]
+    return digits
+
+
+def fill_phone_digits(apps, schema_editor):
+    Client = apps.get_model("tickets", "Client")
+    batch = []
+    for client in Client.objects.only("id", "phone_number").iterator(chunk_size=2000):
+        client.phone_digits = normalize_phone(client.phone_number)
+        batch.append(client)
+        if len(batch) >= 2000:
+            Client.objects.bulk_update(batch, ["phone_digits"])
+            batch = []
+    Client.objects.bulk_update(batch, ["phone_digits"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_inbox_read_markers'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='client',
+            name='phone_digits',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(fill_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='client_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['company'], name='client_company_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['phone_digits'], name='client_phone_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_client_lookup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at', 'id'], name='tickets_com_created_76639a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created_at', 'id'], name='tickets_tic_created_8f9e5d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['project', 'created_at'], name='tickets_tic_project_de1ed1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['client', 'created_at'], name='tickets_tic_client__fd1fe1_idx'),
+        ),
+    ]
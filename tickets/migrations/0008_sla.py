@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:33
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# politiques par défaut (minutes) : prise en charge, résolution
+DEFAULT_POLICIES = {
+    "URG": (30, 4 * 60),
+    "HIG": (2 * 60, 24 * 60),
+    "MED": (8 * 60, 3 * 24 * 60),
+    "LOW": (24 * 60, 7 * 24 * 60),
+}
+
+
+def seed_policies(apps, schema_editor):
+    SLAPolicy = apps.get_model("tickets", "SLAPolicy")
+    SLAPolicy.objects.bulk_create([
+        SLAPolicy(priority=priority, response_minutes=response, resolution_minutes=resolution)
+        for priority, (response, resolution) in DEFAULT_POLICIES.items()
+    ])
+
+
+def fill_deadlines(apps, schema_editor):
+    # tickets déjà ouverts : échéances comptées depuis leur création (politiques par défaut).
+    # Les échéances déjà passées sont marquées comme traitées : le premier passage de
+    # sla_escalate ne doit pas escalader (ni notifier) tout l'historique d'un coup.
+    Ticket = apps.get_model("tickets", "Ticket")
+    fields = ["response_due_at", "resolution_due_at", "responded_at",
+              "sla_warned_at", "response_escalated_at", "resolution_escalated_at"]
+    now = timezone.now()
+    warning = timedelta(minutes=getattr(settings, "SLA_WARNING_MINUTES", 30))
+    batch = []
+    qs = Ticket.objects.exclude(status__in=["RES", "CLO"]).only("id", "priority", "status", "created_at", "updated_at")
+    for ticket in qs.iterator(chunk_size=2000):
+        response, resolution = DEFAULT_POLICIES[ticket.priority]
+        ticket.response_due_at = ticket.created_at + timedelta(minutes=response)
+        ticket.resolution_due_at = ticket.created_at + timedelta(minutes=resolution)
+        if ticket.status != "OPEN":
+            ticket.responded_at = ticket.updated_at  # déjà pris en charge
+        elif ticket.response_due_at <= now:
+            ticket.response_escalated_at = now
+        if ticket.resolution_due_at <= now:
+            ticket.resolution_escalated_at = now
+        if ticket.resolution_due_at <= now + warning:
+            ticket.sla_warned_at = now
+        batch.append(ticket)
+        if len(batch) >= 2000:
+            Ticket.objects.bulk_update(batch, fields)
+            batch = []
+    Ticket.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_activity_feed_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SLAPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.CharField(choices=[('LOW', 'Basse'), ('MED', 'Moyenne'), ('HIG', 'Haute'), ('URG', 'Urgente')], max_length=3)),
+                ('response_minutes', models.PositiveIntegerField(verbose_name='Prise en charge (minutes)')),
+                ('resolution_minutes', models.PositiveIntegerField(verbose_name='Résolution (minutes)')),
+            ],
+            options={
+                'verbose_name': 'Politique SLA',
+                'verbose_name_plural': 'Politiques SLA',
+            },
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='resolution_due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='resolution_escalated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='responded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='response_due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='response_escalated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_warned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status__in', ['RES', 'CLO']), _negated=True), fields=['resolution_due_at'], name='ticket_resolution_due'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('responded_at__isnull', True), models.Q(('status__in', ['RES', 'CLO']), _negated=True)), fields=['response_due_at'], name='ticket_response_due'),
+        ),
+        migrations.AddField(
+            model_name='slapolicy',
+            name='client',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sla_policies', to='tickets.client'),
+        ),
+        migrations.AddField(
+            model_name='slapolicy',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sla_policies', to='tickets.project'),
+        ),
+        migrations.AddIndex(
+            model_name='slapolicy',
+            index=models.Index(fields=['priority'], name='tickets_sla_priorit_438791_idx'),
+        ),
+        migrations.RunPython(seed_policies, migrations.RunPython.noop),
+        migrations.RunPython(fill_deadlines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_sla'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['phone_digits'], name='client_phone_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
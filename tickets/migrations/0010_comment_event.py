@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:55
+
+from django.db import migrations, models
+
+
+def fill_events(apps, schema_editor):
+    # messages système existants : type déduit du préfixe utilisé jusqu'ici
+    Comment = apps.get_model("tickets", "Comment")
+    system = Comment.objects.filter(is_system=True, event="")
+    system.filter(body__startswith="🛠️").update(event="ASG")
+    system.filter(body__startswith="⏱️").update(event="SLA")
+    system.update(event="STA")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_client_phone_substring'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='event',
+            field=models.CharField(blank=True, choices=[('', 'Message'), ('ASG', 'Assignation'), ('STA', 'Statut'), ('SLA', 'SLA')], default='', max_length=3),
+        ),
+        migrations.RunPython(fill_events, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,12 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.urls import reverse
+from django.contrib.postgres.indexes import GinIndex
+import re
+from datetime import timedelta
 
 User = settings.AUTH_USER_MODEL
 
@@ -10,6 +15,15 @@ class Project(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
 
+    # 👇 Devs éligibles à l'assignation auto (vide = tous les devs)
+    developers = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name="projects",
+        limit_choices_to={"role": "DEV", "is_active": True},
+        verbose_name="Développeurs",
+    )
+
     def __str__(self):
         return self.name
 
@@ -17,19 +31,46 @@ class Project(models.Model):
         return reverse("tickets:project_detail", args=[self.pk])
     
 
+def normalize_phone(value):
+    """Chiffres seuls, format national : "+33 6 12 34 56 78" -> "0612345678"."""
+    digits = re.sub(r"\D", "", value or "")
+    if digits.startswith("0033"):
+        digits = "0" + digits[4:]
+    elif digits.startswith("33") and (value or "").lstrip().startswith("+"):
+        digits = "0" + digits[2:]
+    return digits
+
+
 class Client(models.Model):
     name = models.CharField(max_length=200)          # Nom du contact
     phone_number = models.CharField(max_length=200)  # Téléphone
     company = models.CharField(max_length=200)       # Société
+    phone_digits = models.CharField(max_length=32, blank=True, editable=False)  # Téléphone normalisé (recherche)
 
     class Meta:
         verbose_name = "Client"
         verbose_name_plural = "Clients"
         ordering = ["company", "name"]
+        indexes = [
+            # recherche floue (similarité + icontains) via pg_trgm
+            GinIndex(fields=["name"], opclasses=["gin_trgm_ops"], name="client_name_trgm"),
+            GinIndex(fields=["company"], opclasses=["gin_trgm_ops"], name="client_company_trgm"),
+            # recherche par préfixe (LIKE '06%') sur le numéro normalisé
+            models.Index(fields=["phone_digits"], opclasses=["varchar_pattern_ops"], name="client_phone_prefix"),
+            # ... et par sous-chaîne (fin de numéro, numéro partiel)
+            GinIndex(fields=["phone_digits"], opclasses=["gin_trgm_ops"], name="client_phone_trgm"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.company})"
 
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phone_number" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "phone_digits"}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("tickets:client_detail", args=[self.pk])
 
@@ -79,9 +120,87 @@ class Ticket(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     closed_at = models.DateTimeField(null=True, blank=True)
 
+    # 👇 SLA : échéances fixées à la création (cf. SLAPolicy), suivies par sla_escalate
+    response_due_at = models.DateTimeField(null=True, blank=True)
+    resolution_due_at = models.DateTimeField(null=True, blank=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
+    sla_warned_at = models.DateTimeField(null=True, blank=True)
+    response_escalated_at = models.DateTimeField(null=True, blank=True)
+    resolution_escalated_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return f"[{self.get_status_display()}] {self.title}"
 
+    # champs qui déterminent la politique SLA applicable
+    SLA_INPUTS = ("priority", "client_id", "project_id")
+    SLA_FIELDS = ("response_due_at", "resolution_due_at", "sla_warned_at",
+                  "response_escalated_at", "resolution_escalated_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._sla_loaded = tuple(instance.__dict__.get(f) for f in cls.SLA_INPUTS)
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._sla_loaded = tuple(self.__dict__.get(f) for f in self.SLA_INPUTS)
+
+    def sla_deadlines(self, start):
+        """
+        Échéances selon la politique actuelle, comptées depuis `start`. Le suivi
+        (avertissement, escalades) n'est remis à zéro que pour une échéance
+        encore à venir : un ticket déjà en retard et déjà escaladé ne l'est pas
+        une seconde fois parce que quelqu'un a baissé sa priorité.
+        """
+        policy = SLAPolicy.for_ticket(self)
+        response = start + timedelta(minutes=policy.response_minutes) if policy else None
+        resolution = start + timedelta(minutes=policy.resolution_minutes) if policy else None
+        now = timezone.now()
+
+        def keep(marker, due, margin=timedelta(0)):
+            return getattr(self, marker) if due is not None and due <= now + margin else None
+
+        warning = timedelta(minutes=getattr(settings, "SLA_WARNING_MINUTES", 30))
+        return {
+            "response_due_at": response,
+            "resolution_due_at": resolution,
+            "sla_warned_at": keep("sla_warned_at", resolution, warning),
+            "response_escalated_at": keep("response_escalated_at", response),
+            "resolution_escalated_at": keep("resolution_escalated_at", resolution),
+        }
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            if self.resolution_due_at is None:
+                for field, value in self.sla_deadlines(timezone.now()).items():
+                    setattr(self, field, value)
+        elif getattr(self, "_sla_loaded", None) != tuple(getattr(self, f) for f in self.SLA_INPUTS):
+            # priorité / client / projet modifiés : le délai court toujours depuis la création
+            for field, value in self.sla_deadlines(self.created_at).items():
+                setattr(self, field, value)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *self.SLA_FIELDS}
+        super().save(*args, **kwargs)
+        self._sla_loaded = tuple(getattr(self, f) for f in self.SLA_INPUTS)
+
+    @property
+    def is_open(self):
+        return self.status not in (self.Status.RESOLVED, self.Status.CLOSED)
+
+    @property
+    def sla_state(self):
+        """"breached", "soon" (moins de SLA_WARNING_MINUTES) ou "ok" ; None si pas d'échéance en cours."""
+        if not self.is_open or self.resolution_due_at is None:
+            return None
+        remaining = self.resolution_due_at - timezone.now()
+        if remaining.total_seconds() <= 0:
+            return "breached"
+        if remaining <= timedelta(minutes=getattr(settings, "SLA_WARNING_MINUTES", 30)):
+            return "soon"
+        return "ok"
+
     def get_absolute_url(self):
         return reverse("tickets:ticket_detail", args=[self.pk])
 
@@ -101,16 +220,151 @@ class Ticket(models.Model):
             models.Index(fields=["created_at"]),
             models.Index(fields=["client"]),
             models.Index(fields=["project"]),
+            models.Index(fields=["assignee", "status"]),
+            models.Index(fields=["reporter", "status"]),
+            # fil d'activité : pagination par curseur (created_at, id), filtres projet/client
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["project", "created_at"]),
+            models.Index(fields=["client", "created_at"]),
+            # SLA : seuls les tickets non résolus/fermés, triés par échéance
+            models.Index(
+                fields=["resolution_due_at"],
+                condition=~Q(status__in=["RES", "CLO"]),
+                name="ticket_resolution_due",
+            ),
+            models.Index(
+                fields=["response_due_at"],
+                condition=Q(responded_at__isnull=True) & ~Q(status__in=["RES", "CLO"]),
+                name="ticket_response_due",
+            ),
         ]
 
 
 
+class SLAPolicy(models.Model):
+    """Délais de prise en charge et de résolution pour une priorité (éventuellement par client/projet)."""
+    priority = models.CharField(max_length=3, choices=Ticket.Priority.choices)
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, null=True, blank=True, related_name="sla_policies")
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name="sla_policies")
+    response_minutes = models.PositiveIntegerField("Prise en charge (minutes)")
+    resolution_minutes = models.PositiveIntegerField("Résolution (minutes)")
+
+    class Meta:
+        verbose_name = "Politique SLA"
+        verbose_name_plural = "Politiques SLA"
+        indexes = [
+            models.Index(fields=["priority"]),
+        ]
+
+    def __str__(self):
+        scope = " / ".join(str(x) for x in (self.client, self.project) if x) or "défaut"
+        return f"{self.get_priority_display()} ({scope})"
+
+    @classmethod
+    def for_ticket(cls, ticket):
+        """La politique la plus spécifique : client, puis projet, puis défaut de la priorité."""
+        return (
+            cls.objects.filter(priority=ticket.priority)
+            .filter(Q(client__isnull=True) | Q(client_id=ticket.client_id))
+            .filter(Q(project__isnull=True) | Q(project_id=ticket.project_id))
+            .order_by(F("client").asc(nulls_last=True), F("project").asc(nulls_last=True))
+            .first()
+        )
+
+
+
 class Comment(models.Model):
+    class Event(models.TextChoices):
+        MESSAGE = "", "Message"
+        ASSIGNMENT = "ASG", "Assignation"
+        STATUS = "STA", "Statut"
+        SLA = "SLA", "SLA"
+
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     body = models.TextField()
     is_system = models.BooleanField(default=False)  # 👈 NEW
+    # 👇 type d'évènement des messages système (fil d'activité), vide pour un message
+    event = models.CharField(max_length=3, choices=Event.choices, blank=True, default=Event.MESSAGE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["ticket", "created_at"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"Comment #{self.pk} on Ticket #{self.ticket_id}"
+
+
+class TicketReadMarker(models.Model):
+    """Dernière consultation d'un ticket par un utilisateur (messages non lus = postérieurs)."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="read_markers")
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="read_markers")
+    last_read_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "ticket"], name="uniq_read_marker"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} a lu Ticket #{self.ticket_id}"
+
+
+class TicketSignature(models.Model):
+    """Signature MinHash (titre + description) d'un ticket, pour la détection de doublons."""
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, primary_key=True, related_name="signature")
+    minhash = models.JSONField()
+
+    def __str__(self):
+        return f"Signature of Ticket #{self.ticket_id}"
+
+
+class TicketBucket(models.Model):
+    """Index LSH : une ligne par (ticket, bande) ; deux tickets dans le même seau sont candidats."""
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="lsh_buckets")
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ticket", "band"], name="uniq_ticket_band"),
+        ]
+        indexes = [
+            models.Index(fields=["band", "bucket"]),
+        ]
+
+
+class Blob(models.Model):
+    """Contenu d'une pièce jointe, stocké une seule fois par empreinte SHA-256."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class Attachment(models.Model):
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="attachments")
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, blank=True, related_name="attachments")
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name="attachments")
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def is_image(self):
+        return self.content_type in ("image/png", "image/jpeg", "image/gif", "image/webp")
+
+    def get_absolute_url(self):
+        return reverse("tickets:attachment_download", args=[self.pk])
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from helpdesk.cache import two_tier
+from .models import Ticket, Comment, Client, Project
+from . import similarity, inbox, sla
+
+
+@receiver(post_save, sender=Ticket)
+def reindex_ticket_signature(sender, instance, created, update_fields=None, **kwargs):
+    # pas besoin de recalculer si ni le titre ni la description n'ont bougé
+    if update_fields is not None and not {"title", "description"} & set(update_fields):
+        return
+    similarity.index_ticket(instance)
+
+
+@receiver(post_save, sender=Comment)
+def refresh_inbox_badges(sender, instance, created, **kwargs):
+    if created:
+        ticket = instance.ticket
+        inbox.invalidate(ticket.reporter_id, ticket.assignee_id)
+
+
+@receiver(post_save, sender=Comment)
+def mark_ticket_responded(sender, instance, created, **kwargs):
+    # première réponse d'un intervenant = prise en charge (SLA)
+    if created and not instance.is_system and instance.author_id != instance.ticket.reporter_id:
+        sla.mark_responded(instance.ticket_id, instance.created_at)
+
+
+# espaces de noms du cache à invalider quand un modèle change
+# (clients et projets apparaissent dans la recherche/les facettes des tickets)
+CACHE_NAMESPACES = {
+    Ticket: ("tickets",),
+    Client: ("tickets",),
+    Project: ("tickets",),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cache(sender, **kwargs):
+    namespaces = CACHE_NAMESPACES.get(sender)
+    if namespaces:
+        two_tier.invalidate(*namespaces)
@@ -0,0 +1,174 @@
+"""
+Détection de tickets quasi-doublons par MinHash + LSH.
+
+Chaque ticket reçoit une signature MinHash de NUM_PERM entiers calculée sur
+les 5-grammes de caractères de son titre + description normalisés. La
+signature est découpée en BANDS bandes de ROWS valeurs ; chaque bande est
+hachée dans un seau (TicketBucket). Deux tickets partageant au moins un seau
+sont candidats : la recherche ne lit que les lignes des seaux du brouillon,
+via l'index (band, bucket), quelle que soit la taille de la table.
+"""
+import hashlib
+import random
+import re
+import unicodedata
+import zlib
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Ticket, TicketSignature, TicketBucket
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.5
+MAX_BUCKET_SIZE = 50  # au-delà, le seau est trop générique pour être utile
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(502)  # graine fixe : les signatures doivent être stables entre process
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+STOPWORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "cette", "dans", "de", "des", "du", "elle", "en", "et",
+    "est", "il", "ils", "je", "la", "le", "les", "leur", "lui", "ma", "mais", "me", "mes", "mon",
+    "ne", "nos", "notre", "nous", "on", "ou", "par", "pas", "plus", "pour", "qu", "que", "qui",
+    "sa", "se", "ses", "son", "sont", "sur", "ta", "te", "tes", "ton", "tu", "un", "une", "vos",
+    "votre", "vous", "y", "c", "d", "j", "l", "m", "n", "s", "t",
+    "bonjour", "merci", "cordialement",
+}
+
+ACTIVE_STATUSES = [Ticket.Status.OPEN, Ticket.Status.IN_PROGRESS]
+
+
+def normalize(text):
+    """Minuscules, sans accents ni ponctuation, sans mots vides, pluriels simples retirés."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    words = []
+    for w in re.findall(r"[a-z0-9]+", text):
+        if w in STOPWORDS:
+            continue
+        if len(w) > 3 and w[-1] in "sx":
+            w = w[:-1]
+        words.append(w)
+    return " ".join(words)
+
+
+def shingles(text):
+    text = normalize(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(title, description=""):
+    hashes = [zlib.crc32(s.encode()) for s in shingles(f"{title} {description}")]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def bands(signature):
+    """[(band, bucket)] ; bucket = hash 64 bits signé de la bande (tient dans un bigint)."""
+    out = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).digest()
+        out.append((band, int.from_bytes(digest, "big", signed=True)))
+    return out
+
+
+def estimate(sig_a, sig_b):
+    """Estimation de la similarité de Jaccard entre deux signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+@transaction.atomic
+def index_ticket(ticket):
+    sig = minhash(ticket.title, ticket.description)
+    TicketBucket.objects.filter(ticket=ticket).delete()
+    if sig is None:
+        TicketSignature.objects.filter(ticket=ticket).delete()
+        return
+    TicketSignature.objects.update_or_create(ticket=ticket, defaults={"minhash": sig})
+    TicketBucket.objects.bulk_create(
+        TicketBucket(ticket=ticket, band=band, bucket=bucket) for band, bucket in bands(sig)
+    )
+
+
+def _bucket_filter(signature):
+    q = Q()
+    for band, bucket in bands(signature):
+        q |= Q(band=band, bucket=bucket)
+    return q
+
+
+def similar_tickets(title, description="", exclude=None, limit=5,
+                    threshold=DEFAULT_THRESHOLD, active_only=True):
+    """Tickets proches d'un brouillon : [(ticket, score)] du plus au moins similaire."""
+    sig = minhash(title, description)
+    if sig is None:
+        return []
+
+    hits = TicketBucket.objects.filter(_bucket_filter(sig))
+    if exclude:
+        hits = hits.exclude(ticket_id=exclude)
+    if active_only:
+        hits = hits.filter(ticket__status__in=ACTIVE_STATUSES)
+    # les tickets qui partagent le plus de seaux d'abord ; on borne les candidats
+    candidate_ids = list(hits.values("ticket_id")
+                         .annotate(n=Count("id"))
+                         .order_by("-n")
+                         .values_list("ticket_id", flat=True)[:limit * 10])
+
+    scored = []
+    for s in TicketSignature.objects.filter(ticket_id__in=candidate_ids).select_related("ticket"):
+        score = estimate(sig, s.minhash)
+        if score >= threshold:
+            scored.append((s.ticket, score))
+    scored.sort(key=lambda x: (-x[1], -x[0].pk))
+    return scored[:limit]
+
+
+def duplicate_clusters(threshold=DEFAULT_THRESHOLD):
+    """Regroupe les tickets actifs quasi-identiques (union-find sur les collisions LSH)."""
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    rows = (TicketBucket.objects.filter(ticket__status__in=ACTIVE_STATUSES)
+            .order_by("band", "bucket", "ticket_id")
+            .values_list("band", "bucket", "ticket_id")
+            .iterator(chunk_size=5000))
+
+    sigs = {}
+    current, members = None, []
+
+    def flush():
+        group = members[:MAX_BUCKET_SIZE]
+        missing = [pk for pk in group if pk not in sigs]
+        if len(group) > 1 and missing:
+            sigs.update(TicketSignature.objects.filter(ticket_id__in=missing)
+                        .values_list("ticket_id", "minhash"))
+        for i, a in enumerate(group):
+            for b in group[i + 1:]:
+                if find(a) != find(b) and estimate(sigs[a], sigs[b]) >= threshold:
+                    parent[find(b)] = find(a)
+
+    for band, bucket, ticket_id in rows:
+        if (band, bucket) != current:
+            flush()
+            current, members = (band, bucket), []
+        members.append(ticket_id)
+    flush()
+
+    clusters = {}
+    for pk in parent:
+        clusters.setdefault(find(pk), []).append(pk)
+    return sorted((sorted(c) for c in clusters.values() if len(c) > 1), key=len, reverse=True)
@@ -0,0 +1,129 @@
+"""
+Échéances SLA et escalade.
+
+Les échéances sont posées à la création du ticket (`SLAPolicy.for_ticket`).
+`escalate_due()` est appelé périodiquement (commande `sla_escalate`) : les
+requêtes ne lisent que les index partiels sur les tickets non résolus/fermés
+(`ticket_resolution_due`, `ticket_response_due`), du plus en retard au moins
+en retard, donc un passage coûte le nombre de tickets à traiter, pas la taille
+de la table.
+
+Chaque dépassement (prise en charge, résolution) escalade une seule fois : la
+priorité monte d'un cran via un UPDATE conditionnel, un message système est
+ajouté et les intervenants sont notifiés. Les tickets proches de l'échéance de
+résolution déclenchent un avertissement unique.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from helpdesk.cache import two_tier
+from notifications.digest import notify
+from notifications.models import Notification
+from .models import Ticket, Comment
+
+S, P = Ticket.Status, Ticket.Priority
+CLOSED = [S.RESOLVED, S.CLOSED]
+
+NEXT_PRIORITY = {P.LOW: P.MEDIUM, P.MEDIUM: P.HIGH, P.HIGH: P.URGENT, P.URGENT: P.URGENT}
+
+# échéance -> (colonne de suivi, libellé)
+DEADLINES = {
+    "response_due_at": ("response_escalated_at", "prise en charge"),
+    "resolution_due_at": ("resolution_escalated_at", "résolution"),
+}
+
+
+def warning_window():
+    return timedelta(minutes=getattr(settings, "SLA_WARNING_MINUTES", 30))
+
+
+def open_with_deadline(field):
+    """Tickets couverts par l'index partiel de l'échéance `field`."""
+    qs = Ticket.objects.exclude(status__in=CLOSED).filter(**{f"{field}__isnull": False})
+    if field == "response_due_at":
+        qs = qs.filter(responded_at__isnull=True)
+    return qs
+
+
+def mark_responded(ticket_id, when=None):
+    """Première réponse (message d'un intervenant ou sortie du statut Ouvert)."""
+    Ticket.objects.filter(pk=ticket_id, responded_at__isnull=True).update(responded_at=when or timezone.now())
+
+
+def _recipients(ticket):
+    if ticket.assignee_id:
+        return [ticket.assignee, ticket.reporter]
+    # pas encore assigné : les devs du projet doivent voir passer l'alerte
+    return [ticket.reporter, *ticket.project.developers.all()]
+
+
+def _log(ticket, by, msg):
+    Comment.objects.create(ticket=ticket, author=by, body=msg, is_system=True, event=Comment.Event.SLA)
+    notify(Notification.Kind.SLA, ticket, by, _recipients(ticket), f"#{ticket.pk} {ticket.title} — {msg}")
+
+
+def escalate(ticket, by, field, now=None):
+    """Escalade un dépassement ; False si un autre passage l'a déjà traité."""
+    now = now or timezone.now()
+    marker, label = DEADLINES[field]
+    old = ticket.priority
+    new = NEXT_PRIORITY[old]
+    applied = Ticket.objects.filter(pk=ticket.pk, priority=old, **{f"{marker}__isnull": True}).update(
+        priority=new, updated_at=now, **{marker: now},
+    )
+    if not applied:
+        return False
+    ticket.priority, ticket.updated_at = new, now
+    setattr(ticket, marker, now)
+
+    msg = f"⏱️ SLA dépassé ({label})"
+    if new != old:
+        msg += f" : priorité {P(old).label} → {P(new).label}"
+    _log(ticket, by, msg)
+    return True
+
+
+def warn(ticket, by, now=None):
+    now = now or timezone.now()
+    if not Ticket.objects.filter(pk=ticket.pk, sla_warned_at__isnull=True).update(sla_warned_at=now):
+        return False
+    ticket.sla_warned_at = now
+    left = max(int((ticket.resolution_due_at - now).total_seconds() // 60), 0)
+    _log(ticket, by, f"⏱️ Échéance SLA de résolution dans {left} min")
+    return True
+
+
+def escalate_due(by, now=None, batch=100):
+    """Un passage du planificateur ; renvoie [(ticket, action)] pour les tickets traités."""
+    now = now or timezone.now()
+    done = []
+    for field, (marker, _) in DEADLINES.items():
+        due = (open_with_deadline(field)
+               .filter(**{f"{field}__lte": now, f"{marker}__isnull": True})
+               .select_related("reporter", "assignee", "project")
+               .order_by(field)[:batch])
+        done += [(t, "escalated") for t in due if escalate(t, by, field, now)]
+
+    soon = (open_with_deadline("resolution_due_at")
+            .filter(resolution_due_at__gt=now, resolution_due_at__lte=now + warning_window(),
+                    sla_warned_at__isnull=True)
+            .select_related("reporter", "assignee", "project")
+            .order_by("resolution_due_at")[:batch])
+    done += [(t, "warned") for t in soon if warn(t, by, now)]
+
+    if done:
+        two_tier.invalidate("tickets")  # update() ne déclenche pas post_save
+    return done
+
+
+def summary(now=None, limit=10):
+    """Compteurs et prochaines échéances pour le tableau de bord (index partiel de résolution)."""
+    now = now or timezone.now()
+    qs = open_with_deadline("resolution_due_at")
+    return {
+        "sla_breached": qs.filter(resolution_due_at__lte=now).count(),
+        "sla_soon": qs.filter(resolution_due_at__gt=now, resolution_due_at__lte=now + warning_window()).count(),
+        "sla_next": list(qs.select_related("client", "assignee").order_by("resolution_due_at")[:limit]),
+    }
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+
+from jobs.queue import task
+from notifications.digest import notify
+from notifications.models import Notification
+from .models import Ticket
+from .history import _log_status_change, _log_assignment
+
+User = get_user_model()
+
+
+@task("tickets.log_assignment")
+def log_assignment(ticket_id, by_id, assignee_id):
+    ticket = Ticket.objects.filter(pk=ticket_id).first()
+    if ticket is None:
+        return  # ticket supprimé entre-temps
+    assignee = User.objects.filter(pk=assignee_id).first() if assignee_id else None
+    by = User.objects.get(pk=by_id)
+    _log_assignment(ticket, by, assignee)
+    notify(Notification.Kind.ASSIGNMENT, ticket, by, [assignee],
+           f"Ticket #{ticket.pk} assigné à {assignee.get_username() if assignee else '—'}")
+
+
+@task("tickets.log_status_change")
+def log_status_change(ticket_id, by_id, old, new):
+    ticket = Ticket.objects.filter(pk=ticket_id).first()
+    if ticket is None:
+        return
+    by = User.objects.get(pk=by_id)
+    _log_status_change(ticket, by, old, new)
+    notify(Notification.Kind.STATUS, ticket, by, [ticket.reporter, ticket.assignee],
+           f"Ticket #{ticket.pk} : {Ticket.Status(old).label} → {Ticket.Status(new).label}")
@@ -0,0 +1,145 @@
+"""
+Machine à états des tickets.
+
+Toutes les transitions de statut passent par `apply()`, qui exécute un seul
+UPDATE conditionnel (WHERE id = ? AND status = <statut vu par l'utilisateur>)
+sur les seules colonnes modifiées. Si deux personnes cliquent en même temps,
+une seule mise à jour s'applique : l'autre reçoit False et rien n'est loggé.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import PermissionDenied
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from helpdesk.cache import two_tier
+from .models import Ticket
+from .history import log_status_change_later, log_assignment_later, status_change_job, assignment_job
+
+S = Ticket.Status
+
+
+def _anyone(user):
+    return user.is_authenticated
+
+
+def _developer(user):
+    return getattr(user, "is_developer", False) or user.is_staff
+
+
+def _reporter(user):
+    return getattr(user, "is_reporter", False) or user.is_staff
+
+
+class Transition:
+    def __init__(self, sources, target, allowed=_anyone, denied="Action non autorisée."):
+        self.sources = frozenset(sources)
+        self.target = target
+        self.allowed = allowed
+        self.denied = denied
+
+
+TRANSITIONS = {
+    "assign":  Transition({S.OPEN}, S.IN_PROGRESS,
+                          denied="Ce ticket n'est pas ouvert et ne peut plus être assigné."),
+    "resolve": Transition({S.IN_PROGRESS}, S.RESOLVED, _developer, "Action réservée aux développeurs."),
+    "close":   Transition({S.OPEN, S.IN_PROGRESS, S.RESOLVED}, S.CLOSED, _developer,
+                          "Action réservée aux développeurs."),
+    "reopen":  Transition({S.CLOSED}, S.IN_PROGRESS, _reporter, "Action réservée aux rapporteurs."),
+}
+
+
+def can(ticket, name, user):
+    t = TRANSITIONS[name]
+    return ticket.status in t.sources and t.allowed(user)
+
+
+def available(ticket, user):
+    """Noms des transitions possibles pour ce ticket et cet utilisateur (pour les templates)."""
+    return {name for name in TRANSITIONS if can(ticket, name, user)}
+
+
+def apply(ticket, name, user, **fields):
+    """
+    Applique la transition `name` si le ticket est toujours dans le statut lu.
+    `fields` : colonnes à écrire en même temps (ex. assignee). Renvoie True si
+    la ligne a été modifiée ; l'instance est alors mise à jour et l'historique
+    part dans la file de tâches.
+    """
+    t = TRANSITIONS[name]
+    if not t.allowed(user):
+        raise PermissionDenied(t.denied)
+    old = ticket.status
+    if old not in t.sources:
+        return False
+
+    now = timezone.now()
+    values = {"status": t.target, "updated_at": now, **fields}
+    if t.target == S.CLOSED:
+        values["closed_at"] = now
+    elif old == S.CLOSED:
+        values["closed_at"] = None
+        # réouverture : nouvelles échéances, sinon l'escalade repartirait aussitôt
+        values.update(ticket.sla_deadlines(now))
+    if ticket.responded_at is None:
+        values["responded_at"] = now  # prise en charge (SLA)
+
+    applied = Ticket.objects.filter(pk=ticket.pk, status=old).update(**values)
+    if not applied:
+        return False
+
+    for field, value in values.items():
+        setattr(ticket, field, value)
+    two_tier.invalidate("tickets")  # update() ne déclenche pas post_save
+    if "assignee" in fields:
+        log_assignment_later(ticket, user, fields["assignee"])
+    log_status_change_later(ticket, user, old, t.target)
+    return True
+
+
+def apply_many(tickets, name, user, **fields):
+    """Version lot (actions groupées) : renvoie les tickets effectivement modifiés."""
+    return [ticket for ticket in tickets if apply(ticket, name, user, **fields)]
+
+
+def assign_many(plan, user):
+    """
+    Transition "assign" en lot : `plan` = [(ticket, dev)]. Un UPDATE conditionnel
+    par développeur (tickets toujours ouverts et sans assigné), un seul INSERT
+    pour tous les logs et une seule invalidation du cache. Renvoie les tickets
+    effectivement assignés.
+    """
+    from jobs.queue import enqueue_many
+
+    t = TRANSITIONS["assign"]
+    if not t.allowed(user):
+        raise PermissionDenied(t.denied)
+    by_dev = defaultdict(list)
+    for ticket, dev in plan:
+        if dev is not None and ticket.status in t.sources:
+            by_dev[dev].append(ticket)
+
+    now = timezone.now()
+    done, jobs = [], []
+    for dev, tickets in by_dev.items():
+        ids = [ticket.pk for ticket in tickets]
+        n = Ticket.objects.filter(pk__in=ids, status__in=t.sources, assignee__isnull=True).update(
+            status=t.target, assignee=dev, updated_at=now,
+            responded_at=Coalesce("responded_at", Value(now)),  # prise en charge (SLA)
+        )
+        if n != len(ids):  # certains ont changé entre-temps : on relit lesquels sont à nous
+            ids = set(Ticket.objects.filter(pk__in=ids, assignee=dev, updated_at=now).values_list("pk", flat=True))
+        for ticket in tickets:
+            if ticket.pk not in ids:
+                continue
+            old = ticket.status
+            ticket.status, ticket.assignee, ticket.updated_at = t.target, dev, now
+            ticket.responded_at = ticket.responded_at or now
+            jobs += [assignment_job(ticket, user, dev), status_change_job(ticket, user, old, t.target)]
+            done.append(ticket)
+
+    if done:
+        enqueue_many(jobs)
+        two_tier.invalidate("tickets")  # update() ne déclenche pas post_save
+    return done
@@ -5,20 +5,30 @@ app_name = "tickets"
 urlpatterns = [
     path("", views.TicketListView.as_view(), name="ticket_list"),
     path("new/", views.TicketCreateView.as_view(), name="ticket_create"),
+    path("inbox/", views.InboxView.as_view(), name="inbox"),
+    path("activity/", views.ActivityView.as_view(), name="activity"),
+    path("activity/feed/", views.activity_feed, name="activity_feed"),
+    path("similar/", views.ticket_similar, name="ticket_similar"),
     path("<int:pk>/", views.TicketDetailView.as_view(), name="ticket_detail"),
     path("<int:pk>/edit/", views.TicketUpdateView.as_view(), name="ticket_update"),
     path("tickets/<int:pk>/delete/", views.TicketDeleteView.as_view(), name="ticket_delete"),
     path("<int:pk>/assign/", views.ticket_assign, name="ticket_assign"),
+    path("auto-assign/", views.ticket_auto_assign, name="ticket_auto_assign"),
     path("<int:pk>/close/", views.ticket_close, name="ticket_close"),
     path("<int:pk>/resolve/", views.ticket_resolve, name="ticket_resolve"),
     path("<int:pk>/reopen/", views.ticket_reopen, name="ticket_reopen"),
     path("<int:pk>/comment/", views.add_comment, name="add_comment"),
+    path("<int:pk>/attach/", views.ticket_attach, name="ticket_attach"),
+    path("attachments/<int:pk>/", views.attachment_download, name="attachment_download"),
+    path("attachments/<int:pk>/thumb/", views.attachment_thumbnail, name="attachment_thumbnail"),
     path("clients/", views.ClientListView.as_view(), name="client_list"),
+    path("clients/lookup/", views.client_lookup_view, name="client_lookup"),
     path("clients/new/", views.ClientCreateView.as_view(), name="client_create"),
     path("clients/<int:pk>/", views.ClientDetailView.as_view(), name="client_detail"),
     path("clients/<int:pk>/edit/", views.ClientUpdateView.as_view(), name="client_update"),
     path("clients/<int:pk>/delete/", views.ClientDeleteView.as_view(), name="client_delete"),
     path("dashboard/", views.DashboardView.as_view(), name="dashboard"),
+    path("cache-stats/", views.cache_stats, name="cache_stats"),
     path("projects/", views.ProjectListView.as_view(), name="project_list"),
     path("projects/new/", views.ProjectCreateView.as_view(), name="project_create"),
     path("projects/<int:pk>/", views.ProjectDetailView.as_view(), name="project_detail"),
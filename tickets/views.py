@@ -9,25 +9,22 @@ from django import forms
 from django.contrib import messages
 from .models import Ticket, Project, Comment, Client
 from django.db.models import Count, Q, Case, When, IntegerField
-from django.utils.html import escape
+from django.utils.encoding import escape_uri_path
+from django.utils.cache import patch_vary_headers
 from django.urls import reverse_lazy
+from . import assignment, similarity, facets, transitions, inbox, client_lookup, activity, sla
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse, Http404
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.conf import settings
+from helpdesk.cache import two_tier
+from .models import Attachment
+from . import attachments
+import os
+from notifications.digest import notify
+from notifications.models import Notification
 
 
 
-def _log_status_change(ticket, user, old_code, new_code):
-    # labels lisibles
-    old_label = Ticket.Status(old_code).label if old_code else "—"
-    new_label = Ticket.Status(new_code).label if new_code else "—"
-    msg = f"🛈 Statut changé : {escape(old_label)} → {escape(new_label)} par {escape(user.get_username())}"
-    Comment.objects.create(ticket=ticket, author=user, body=msg, is_system=True)
-
-def _log_assignment(ticket, user, assignee):
-    who = escape(assignee.get_username()) if assignee else "—"
-    by  = escape(user.get_username())
-    msg = f"🛠️ Assigné à {who} par {by}"
-    Comment.objects.create(ticket=ticket, author=user, body=msg, is_system=True)
-
-
 def custom_permission_denied_view(request, exception=None):
     return render(request, '403.html', status=403)
 
@@ -47,6 +44,14 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # recalculé seulement après une modification de ticket (cache "tickets")
+        context.update(two_tier.get_or_set("tickets", "dashboard", self._stats))
+        # dépend de l'heure : pas de cache, mais lu sur l'index partiel des échéances
+        context.update(sla.summary())
+        return context
+
+    def _stats(self):
+        context = {}
         tickets = Ticket.objects.all()
 
         context["total_tickets"] = tickets.count()
@@ -103,7 +108,7 @@ class ProjectDetailView(LoginRequiredMixin, DetailView):
 
 class ProjectCreateView(LoginRequiredMixin, DeveloperRequiredMixin, CreateView):
     model = Project
-    fields = ["name", "description"]
+    fields = ["name", "description", "developers"]
     template_name = "projects/project_form.html"
 
     def form_valid(self, form):
@@ -113,7 +118,7 @@ class ProjectCreateView(LoginRequiredMixin, DeveloperRequiredMixin, CreateView):
 
 class ProjectUpdateView(LoginRequiredMixin, DeveloperRequiredMixin, UpdateView):
     model = Project
-    fields = ["name", "description"]
+    fields = ["name", "description", "developers"]
     template_name = "projects/project_form.html"
 
     def form_valid(self, form):
@@ -129,6 +134,29 @@ class TicketListView(LoginRequiredMixin, ListView):
     model = Ticket
     paginate_by = 20
     template_name = "tickets/ticket_list.html"
+    partial_template_name = "tickets/_ticket_results.html"
+
+    @property
+    def partial(self):
+        """
+        Rendu partiel (tableau + pagination seulement) demandé par le JS de la liste :
+        en-tête "X-Partial: results" (ou "results,facets" pour recevoir aussi les
+        compteurs), ou ?partial=1.
+        """
+        header = self.request.headers.get("X-Partial", "")
+        if header:
+            return {p.strip() for p in header.split(",")}
+        return {"results"} if self.request.GET.get("partial") == "1" else set()
+
+    def get_template_names(self):
+        if self.partial:
+            return [self.partial_template_name]
+        return super().get_template_names()
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        patch_vary_headers(response, ["X-Partial"])
+        return response
 
     def _with_ranks(self, qs):
         return qs.annotate(
@@ -148,11 +176,7 @@ class TicketListView(LoginRequiredMixin, ListView):
             ),
         )
 
-    def get_queryset(self):
-        qs = (super().get_queryset()
-              .select_related("client", "project", "reporter", "assignee"))
-
-        # --- recherche & filtres (comme chez toi) ---
+    def _search(self, qs):
         q = self.request.GET.get("q", "").strip()
         if q:
             qs = qs.filter(
@@ -164,7 +188,9 @@ class TicketListView(LoginRequiredMixin, ListView):
                 Q(reporter__username__icontains=q) |
                 Q(assignee__username__icontains=q)
             )
+        return qs
 
+    def _selected_facets(self):
         status_list   = [s for s in self.request.GET.getlist("status")   if s in dict(Ticket.Status.choices)]
         priority_list = [p for p in self.request.GET.getlist("priority") if p in dict(Ticket.Priority.choices)]
 
@@ -176,11 +202,21 @@ class TicketListView(LoginRequiredMixin, ListView):
             return out
         client_ids  = to_ints(self.request.GET.getlist("client"))
         project_ids = to_ints(self.request.GET.getlist("project"))
+        return {"status": status_list, "priority": priority_list, "client": client_ids, "project": project_ids}
 
-        if status_list:   qs = qs.filter(status__in=status_list)
-        if priority_list: qs = qs.filter(priority__in=priority_list)
-        if client_ids:    qs = qs.filter(client_id__in=client_ids)
-        if project_ids:   qs = qs.filter(project_id__in=project_ids)
+    def get_queryset(self):
+        qs = (super().get_queryset()
+              .select_related("client", "project", "reporter", "assignee"))
+
+        # --- recherche & filtres (comme chez toi) ---
+        qs = self._search(qs)
+        self.search_queryset = qs  # base des compteurs de facettes
+        selected = self.selected_facets = self._selected_facets()
+
+        if selected["status"]:   qs = qs.filter(status__in=selected["status"])
+        if selected["priority"]: qs = qs.filter(priority__in=selected["priority"])
+        if selected["client"]:   qs = qs.filter(client_id__in=selected["client"])
+        if selected["project"]:  qs = qs.filter(project_id__in=selected["project"])
 
         # --- TRI ---
         sort = (self.request.GET.get("sort") or "").strip()
@@ -215,11 +251,26 @@ class TicketListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         GET = self.request.GET
-
-        ctx["status_choices"]   = Ticket.Status.choices
-        ctx["priority_choices"] = Ticket.Priority.choices
-        ctx["clients"]  = Client.objects.order_by("company", "name")
-        ctx["projects"] = Project.objects.order_by("name")
+        partial = self.partial
+
+        if not partial:
+            # les sélecteurs ne sont rendus qu'au chargement complet de la page
+            ctx["status_choices"]   = Ticket.Status.choices
+            ctx["priority_choices"] = Ticket.Priority.choices
+            ctx["clients"]  = Client.objects.order_by("company", "name")
+            ctx["projects"] = Project.objects.order_by("name")
+
+        if not partial or "facets" in partial:
+            # compteurs par facette (None = budget de temps dépassé → pas de compteurs)
+            counts = facets.facet_counts(self.search_queryset, self.selected_facets)
+            ctx["facet_counts"] = counts
+        if not partial:
+            def count(facet, value):
+                return None if counts is None else counts[facet].get(value, 0)
+            ctx["status_options"]   = [(c, l, count("status", c)) for c, l in Ticket.Status.choices]
+            ctx["priority_options"] = [(c, l, count("priority", c)) for c, l in Ticket.Priority.choices]
+            ctx["client_options"]   = [(c, count("client", c.id)) for c in ctx["clients"]]
+            ctx["project_options"]  = [(p, count("project", p.id)) for p in ctx["projects"]]
 
         ctx["current"] = {
             "q":        GET.get("q", ""),
@@ -234,12 +285,13 @@ class TicketListView(LoginRequiredMixin, ListView):
         from django.utils.http import urlencode
         pairs = []
         for k, vals in GET.lists():
-            if k in ("sort", "page"):
+            if k in ("page", "partial"):
                 continue
             for v in vals:
                 if v != "":
                     pairs.append((k, v))
-        ctx["qs_without_sort"] = urlencode(pairs, doseq=True)
+        ctx["qs_without_sort"] = urlencode([(k, v) for k, v in pairs if k != "sort"], doseq=True)
+        ctx["qs_without_page"] = urlencode(pairs, doseq=True)
         return ctx
 
 
@@ -257,14 +309,29 @@ class ClientListView(LoginRequiredMixin, ReporterRequiredMixin, ListView):
         qs = super().get_queryset()
         q = self.request.GET.get("q", "").strip()
         if q:
-            qs = qs.filter(
-                Q(name__icontains=q) |
-                Q(company__icontains=q) |
-                Q(phone_number__icontains=q)
-            )
+            qs = client_lookup.search_clients(q, qs)  # 👈 index pg_trgm / préfixe téléphone
         return qs
 
 
+@login_required
+def client_lookup_view(request):
+    """Recherche instantanée (identification de l'appelant) : JSON des meilleurs résultats."""
+    if not (getattr(request.user, "is_reporter", False) or request.user.is_staff):
+        from django.core.exceptions import PermissionDenied
+        raise PermissionDenied
+    results = client_lookup.lookup_clients(request.GET.get("q", "")[:100])
+    return JsonResponse({"results": [
+        {
+            "id": c.pk,
+            "name": c.name,
+            "company": c.company,
+            "phone_number": c.phone_number,
+            "url": c.get_absolute_url(),
+        }
+        for c in results
+    ]})
+
+
 class ClientDetailView(LoginRequiredMixin, ReporterRequiredMixin,DetailView):
     model = Client
     template_name = "clients/client_detail.html"
@@ -290,13 +357,91 @@ class ClientUpdateView(LoginRequiredMixin, ReporterRequiredMixin,  UpdateView):
         return super().form_valid(form)
     
 
+class InboxView(LoginRequiredMixin, ListView):
+    paginate_by = 20
+    template_name = "tickets/inbox.html"
+
+    def get_queryset(self):
+        qs = inbox.inbox_queryset(self.request.user).select_related("client", "project", "assignee")
+        if self.request.GET.get("all") != "1":
+            qs = qs.exclude(status=Ticket.Status.CLOSED)
+        if self.request.GET.get("unread") == "1":
+            qs = qs.filter(unread__gt=0)
+        return qs.order_by("-unread", "-updated_at")
+
+
+def _activity_filters(request):
+    filters = {}
+    for field in ("project", "client", "assignee"):
+        value = request.GET.get(field, "")
+        if value.isdigit():
+            filters[field] = int(value)
+    return filters
+
+
+def _activity_limit(request):
+    value = request.GET.get("limit", "")
+    return int(value) if value.isdigit() else activity.DEFAULT_LIMIT
+
+
+class ActivityView(LoginRequiredMixin, TemplateView):
+    template_name = "tickets/activity.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        filters = _activity_filters(self.request)
+        events, next_cursor = activity.feed(filters)
+        context.update({
+            "events": events,
+            "next_cursor": next_cursor,
+            # point de départ du polling, même si la page est vide
+            "newest_cursor": events[0]["cursor"] if events else activity.encode_cursor(timezone.now(), activity.TICKET, 0),
+            "filters": filters,
+            "projects": Project.objects.order_by("name").only("id", "name"),
+            # seul le client filtré est rendu : les autres viennent de la recherche (client_lookup)
+            "client": Client.objects.filter(pk=filters.get("client")).first() if filters.get("client") else None,
+            "can_lookup_clients": getattr(self.request.user, "is_reporter", False) or self.request.user.is_staff,
+            "assignees": get_user_model().objects.filter(role="DEV").order_by("username"),
+        })
+        return context
+
+
+@login_required
+def activity_feed(request):
+    """JSON du fil : `before=<curseur>` pour la page suivante, `after=<curseur>` pour le polling."""
+    try:
+        events, cursor = activity.feed(
+            _activity_filters(request),
+            before=request.GET.get("before") or None,
+            after=request.GET.get("after") or None,
+            limit=_activity_limit(request),
+        )
+    except activity.InvalidCursor:
+        return JsonResponse({"error": "curseur invalide"}, status=400)
+    return JsonResponse({
+        "events": [
+            {**e, "at": timezone.localtime(e["at"]).strftime("%Y-%m-%d %H:%M")}
+            for e in events
+        ],
+        "cursor": cursor,
+    })
+
+
 class TicketDetailView(LoginRequiredMixin, DetailView):
     model = Ticket
     template_name = "tickets/ticket_detail.html"
 
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        inbox.mark_read(request.user, self.object)
+        return response
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
+        context["comments"] = self.object.comments.select_related("author").prefetch_related("attachments__blob")
+        context["ticket_attachments"] = self.object.attachments.filter(comment__isnull=True).select_related("blob")
+        context["transitions"] = transitions.available(self.object, self.request.user)
         return context
 
 
@@ -319,19 +464,68 @@ class TicketCreateView(LoginRequiredMixin, ReporterRequiredMixin,  CreateView):
         # Masquer "assignee" si l'utilisateur n'est pas développeur ni staff
         if not (getattr(user, "is_reporter", False) or user.is_staff):
             form.fields.pop("assignee", None)
+        else:
+            form.fields["auto_assign"] = forms.BooleanField(
+                required=False,
+                label="Assigner automatiquement au développeur le moins chargé",
+            )
 
         return form
 
     def form_valid(self, form):
         # Forcer le reporter = utilisateur connecté
         form.instance.reporter = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if form.cleaned_data.get("auto_assign") and not self.object.assignee_id:
+            dev = assignment.auto_assign(self.object, self.request.user)
+            if dev:
+                messages.success(self.request, f"Ticket assigné automatiquement à {dev}.")
+            else:
+                messages.warning(self.request, "Aucun développeur éligible pour ce projet.")
+        return response
+
+
+@login_required
+def cache_stats(request):
+    """Statistiques du cache à deux niveaux pour ce worker (staff seulement)."""
+    if not request.user.is_staff:
+        from django.core.exceptions import PermissionDenied
+        raise PermissionDenied
+    return JsonResponse(two_tier.info())
+
+
+@login_required
+def ticket_similar(request):
+    """Doublons probables d'un brouillon de ticket (appelé en JS depuis le formulaire)."""
+    title = request.GET.get("title", "")[:200]
+    description = request.GET.get("description", "")[:5000]
+    try:
+        exclude = int(request.GET.get("exclude", ""))
+    except ValueError:
+        exclude = None
+    results = similarity.similar_tickets(title, description, exclude=exclude)
+    return JsonResponse({"results": [
+        {
+            "id": t.pk,
+            "title": t.title,
+            "status": t.get_status_display(),
+            "url": t.get_absolute_url(),
+            "score": round(score, 2),
+        }
+        for t, score in results
+    ]})
 
 
 class TicketUpdateView(LoginRequiredMixin, ReporterRequiredMixin, UpdateView):
     model = Ticket
     fields = ["title", "description", "project", "priority", "assignee"]
 
+    def form_valid(self, form):
+        # n'écrit que les champs du formulaire : ne pas écraser un changement de statut concurrent
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=[*form.fields, "updated_at"])
+        return redirect(self.get_success_url())
+
 
 # --- Commentaires ---
 class CommentForm(forms.ModelForm):
@@ -343,16 +537,50 @@ class CommentForm(forms.ModelForm):
         }
 
 
+def _streaming_uploads(view):
+    """
+    Les fichiers sont écrits sur disque au fil de l'upload (HashingUploadHandler).
+    Le handler doit être posé avant que le middleware CSRF ne lise request.POST,
+    d'où csrf_exempt à l'extérieur et csrf_protect à l'intérieur.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [attachments.HashingUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def _upload_refused(request, ticket):
+    """Message d'erreur si l'envoi doit être refusé (ticket fermé, fichier trop gros), sinon None."""
+    if ticket.status == Ticket.Status.CLOSED:
+        return "Ce ticket est fermé : rouvrez-le pour ajouter un message ou un fichier."
+    request.POST  # lit le corps : le handler signale un fichier trop volumineux
+    if getattr(request, "rejected_upload", None):
+        limit = attachments.MAX_SIZE // (1024 * 1024)
+        return f"« {request.rejected_upload} » dépasse la taille maximale ({limit} Mo) : rien n'a été envoyé."
+    return None
+
+
 @login_required
 @require_POST
+@_streaming_uploads
 def add_comment(request, pk):
     ticket = get_object_or_404(Ticket, pk=pk)
+    refused = _upload_refused(request, ticket)
+    if refused:
+        messages.error(request, refused)
+        return redirect("tickets:ticket_detail", pk=pk)
     form = CommentForm(request.POST)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.ticket = ticket
         comment.author = request.user
         comment.save()
+        attachments.attach_uploads(request.FILES.getlist("files"), ticket, request.user, comment=comment)
+        notify(Notification.Kind.COMMENT, ticket, request.user, [ticket.reporter, ticket.assignee],
+               f"Nouveau message de {request.user.get_username()} sur le ticket #{ticket.pk}")
         messages.success(request, "Message envoyé.")
     else:
         messages.error(request, "Erreur lors de l’envoi du message.")
@@ -360,19 +588,101 @@ def add_comment(request, pk):
 
 
 @login_required
-def ticket_close(request, pk):
+@require_POST
+@_streaming_uploads
+def ticket_attach(request, pk):
+    ticket = get_object_or_404(Ticket, pk=pk)
+    refused = _upload_refused(request, ticket)
+    if refused:
+        messages.error(request, refused)
+        return redirect("tickets:ticket_detail", pk=pk)
+    added = attachments.attach_uploads(request.FILES.getlist("files"), ticket, request.user)
+    if added:
+        messages.success(request, f"{len(added)} fichier(s) joint(s).")
+    else:
+        messages.error(request, "Aucun fichier reçu.")
+    return redirect("tickets:ticket_detail", pk=pk)
+
+
+def _not_modified(request, etag):
+    return etag in [t.strip() for t in request.headers.get("If-None-Match", "").split(",")]
+
+
+@login_required
+def attachment_download(request, pk):
+    att = get_object_or_404(Attachment.objects.select_related("blob"), pk=pk)
+    etag = f'"{att.blob_id}"'
+    if _not_modified(request, etag):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    path = attachments.blob_path(att.blob_id)
+    if not os.path.exists(path):
+        raise Http404("Fichier introuvable.")
+    size = att.blob.size
+    inline = att.is_image and "download" not in request.GET
+
+    if settings.ATTACHMENTS_SENDFILE_HEADER:
+        # le serveur frontal (nginx/apache) envoie le fichier et gère les Range
+        response = HttpResponse(content_type=att.content_type)
+        response[settings.ATTACHMENTS_SENDFILE_HEADER] = (
+            settings.ATTACHMENTS_SENDFILE_PREFIX + os.path.relpath(path, attachments.ROOT)
+        )
+    else:
+        byte_range = None
+        if request.headers.get("If-Range", etag) == etag:
+            byte_range = attachments.parse_range(request.headers.get("Range"), size)
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                attachments.iter_file(path, start, end - start + 1),
+                status=206, content_type=att.content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = str(end - start + 1)
+        else:
+            response = FileResponse(open(path, "rb"), content_type=att.content_type)
+            response["Content-Length"] = str(size)
+        response["Accept-Ranges"] = "bytes"
+
+    disposition = "inline" if inline else "attachment"
+    response["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{escape_uri_path(att.filename)}"
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=31536000, immutable"  # contenu adressé par empreinte
+    return response
+
+
+@login_required
+def attachment_thumbnail(request, pk):
+    att = get_object_or_404(Attachment, pk=pk)
+    etag = f'"{att.blob_id}-thumb"'
+    if _not_modified(request, etag):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+    path = attachments.thumbnail(att)
+    if path is None:
+        raise Http404("Pas de miniature pour ce fichier.")
+    response = FileResponse(open(path, "rb"), content_type="image/png")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
+def _transition_view(request, pk, name):
     t = get_object_or_404(Ticket, pk=pk)
-    if not (getattr(request.user, "is_developer", False) or request.user.is_staff):
-        from django.core.exceptions import PermissionDenied
-        raise PermissionDenied("Action réservée aux développeurs.")
-    old = t.status
-    t.status = t.Status.CLOSED
-    t.closed_at = timezone.now()
-    t.save()
-    _log_status_change(t, request.user, old, t.status)  # 👈
+    if not transitions.apply(t, name, request.user):  # 👈 UPDATE conditionnel, logs via la file
+        messages.warning(request, "Le ticket a changé entre-temps : action ignorée.")
     return redirect("tickets:ticket_detail", pk=pk)
 
 
+@login_required
+@require_POST
+def ticket_close(request, pk):
+    return _transition_view(request, pk, "close")
+
+
 
 class AssignTicketForm(forms.Form):
     assignee = forms.ModelChoiceField(
@@ -383,20 +693,17 @@ class AssignTicketForm(forms.Form):
 @login_required
 def ticket_assign(request, pk):
     ticket = get_object_or_404(Ticket, pk=pk)
-    if ticket.status != Ticket.Status.OPEN:
+    if not transitions.can(ticket, "assign", request.user):
         from django.core.exceptions import PermissionDenied
-        raise PermissionDenied("Ce ticket n'est pas ouvert et ne peut plus être assigné.")
+        raise PermissionDenied(transitions.TRANSITIONS["assign"].denied)
 
     if request.method == "POST":
         form = AssignTicketForm(request.POST)
         if form.is_valid():
-            old = ticket.status
-            ticket.assignee = form.cleaned_data["assignee"]
-            ticket.status = Ticket.Status.IN_PROGRESS
-            ticket.save()
-            _log_assignment(ticket, request.user, ticket.assignee)         # 👈 log assign
-            _log_status_change(ticket, request.user, old, ticket.status)   # 👈 log statut
-            messages.success(request, f"Ticket assigné à {ticket.assignee}.")
+            if assignment.assign_ticket(ticket, form.cleaned_data["assignee"], request.user):  # 👈 logs assign + statut
+                messages.success(request, f"Ticket assigné à {ticket.assignee}.")
+            else:
+                messages.warning(request, "Le ticket a été pris en charge entre-temps.")
             return redirect("tickets:ticket_detail", pk=ticket.pk)
     else:
         form = AssignTicketForm()
@@ -405,30 +712,50 @@ def ticket_assign(request, pk):
 
 
 @login_required
-def ticket_resolve(request, pk):
-    t = get_object_or_404(Ticket, pk=pk)
+def ticket_auto_assign(request):
     if not (getattr(request.user, "is_developer", False) or request.user.is_staff):
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("Action réservée aux développeurs.")
-    old = t.status
-    t.status = t.Status.RESOLVED
-    t.save()
-    _log_status_change(t, request.user, old, t.status)  # 👈
-    return redirect("tickets:ticket_detail", pk=pk)
 
+    project = None
+    if request.GET.get("project"):
+        project = get_object_or_404(Project, pk=request.GET["project"])
+
+    if request.method == "POST":
+        plan = assignment.drain_backlog(request.user, project=project)
+        done = sum(1 for _, dev in plan if dev)
+        messages.success(request, f"{done} ticket(s) assigné(s) automatiquement.")
+        if done < len(plan):
+            messages.warning(request, f"{len(plan) - done} ticket(s) sans développeur éligible.")
+        return redirect("tickets:ticket_list")
+
+    # GET = aperçu (dry-run), rien n'est écrit
+    engine = assignment.AssignmentEngine()
+    loads_before = dict(engine.loads)
+    plan = engine.plan(assignment.backlog(project).select_related("project", "client"))
+    loads = [
+        {"dev": dev, "before": loads_before[pk], "after": engine.loads[pk]}
+        for pk, dev in sorted(engine.developers.items(), key=lambda kv: engine.loads[kv[0]])
+    ]
+    return render(request, "tickets/ticket_auto_assign.html", {
+        "plan": plan,
+        "loads": loads,
+        "project": project,
+        "projects": Project.objects.order_by("name"),
+    })
 
 
 @login_required
+@require_POST
+def ticket_resolve(request, pk):
+    return _transition_view(request, pk, "resolve")
+
+
+
+@login_required
+@require_POST
 def ticket_reopen(request, pk):
-    t = get_object_or_404(Ticket, pk=pk)
-    if not (getattr(request.user, "is_reporter", False) or request.user.is_staff):
-        from django.core.exceptions import PermissionDenied
-        raise PermissionDenied("Action réservée aux rapporteurs.")
-    old = t.status
-    t.status = t.Status.IN_PROGRESS
-    t.save()
-    _log_status_change(t, request.user, old, t.status)  # 👈
-    return redirect("tickets:ticket_detail", pk=pk)
+    return _transition_view(request, pk, "reopen")
 
 
 